@@ -12,7 +12,6 @@ from app.api.deps import get_db, validate_init_data
 from app.bot.instance import bot
 from app.core.config import settings
 from app.core.i18n import ROOT_LOCALE, translator_hub
-from app.core.valkey import valkey
 from app.db.models.captcha_session import ChatCaptchaSession
 from app.db.models.chat import Chat
 from app.db.models.user import User
@@ -142,10 +141,9 @@ async def solve_captcha(
             permissions=permissions,
         )
 
-        lang_code = await valkey.get(f"lang:{captcha_session.chat_id}")
-        i18n = translator_hub.get_translator_by_locale(lang_code or ROOT_LOCALE)
-
         chat = await session.get(Chat, captcha_session.chat_id)
+        i18n = translator_hub.get_translator_by_locale(chat.language_code if chat else ROOT_LOCALE)
+
         if chat and chat.welcome_enabled:
             await bot.edit_message_reply_markup(
                 chat_id=captcha_session.chat_id,
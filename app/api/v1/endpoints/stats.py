@@ -1,16 +1,18 @@
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.bot.ingestion import update_queue
 from app.db.models.chat import Chat
 from app.db.models.daily_stat import DailyStat
 from app.db.models.trigger import Trigger
 from app.db.models.user import User
-from app.schemas.stats import DailyActivity, StatsResponse
+from app.schemas.stats import DailyActivity, IngestionStats, StatsResponse
+from app.services.stats_service import StatsService
 
 router = APIRouter()
 
@@ -57,10 +59,22 @@ async def get_stats(
     # Daily Stats
     stats_query = select(DailyStat).where(DailyStat.date >= thirty_days_ago).order_by(DailyStat.date)
     stats_result = await db.execute(stats_query)
-    daily_stats = stats_result.scalars().all()
+    daily_stats = {
+        s.date: {"messages_count": s.messages_count, "triggers_count": s.triggers_count} for s in stats_result.scalars()
+    }
 
-    message_activity = [DailyActivity(date=s.date, count=s.messages_count) for s in daily_stats]
-    trigger_usage_activity = [DailyActivity(date=s.date, count=s.triggers_count) for s in daily_stats]
+    # Счётчики, ещё не выгруженные воркером из Valkey
+    pending = await StatsService.get_pending_daily()
+    for day, counts in pending.items():
+        if day < thirty_days_ago.date():
+            continue
+        merged = daily_stats.setdefault(day, {"messages_count": 0, "triggers_count": 0})
+        merged["messages_count"] += counts["messages_count"]
+        merged["triggers_count"] += counts["triggers_count"]
+
+    days = sorted(daily_stats)
+    message_activity = [DailyActivity(date=day, count=daily_stats[day]["messages_count"]) for day in days]
+    trigger_usage_activity = [DailyActivity(date=day, count=daily_stats[day]["triggers_count"]) for day in days]
 
     return StatsResponse(
         total_users=total_users or 0,
@@ -72,3 +86,13 @@ async def get_stats(
         message_activity=message_activity,
         trigger_usage_activity=trigger_usage_activity,
     )
+
+
+@router.get("/ingestion", response_model=IngestionStats)
+async def get_ingestion_stats(
+    admin: Annotated[User, Depends(deps.get_current_admin)],
+) -> Any:
+    """
+    Получить метрики очереди апдейтов вебхука.
+    """
+    return IngestionStats(**update_queue.stats())
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -13,16 +14,24 @@ from app.core.valkey import valkey
 from app.db.models.trigger import Trigger
 from app.db.models.user import User
 from app.schemas.moderation import ModerationHistoryListResponse, ModerationHistoryRead
-from app.schemas.trigger import TriggerListResponse, TriggerQueueStatus, TriggerRead
+from app.schemas.trigger import (
+    SlowRegexListResponse,
+    SlowRegexRead,
+    TriggerListResponse,
+    TriggerQueueStatus,
+    TriggerRead,
+)
 from app.services.moderation_history_service import (
     SSE_CHANNEL_PREFIX,
     get_current_step,
     get_history_by_trigger,
 )
+from app.services.regex_guard import clear_slow_regex_reports
 from app.services.trigger_service import (
     approve_trigger,
     delete_trigger_by_id,
     get_processing_status,
+    get_slow_regex_triggers,
     get_triggers_filtered,
     requeue_trigger,
 )
@@ -58,6 +67,36 @@ async def get_triggers(
     return TriggerListResponse(items=items, total=total)
 
 
+@router.get("/slow-regex", response_model=SlowRegexListResponse)
+async def get_slow_regex(
+    session: Annotated[AsyncSession, Depends(get_db)],
+    admin: Annotated[User, Depends(get_current_admin)],
+) -> SlowRegexListResponse:
+    """Получить триггеры, регулярки которых превысили бюджет времени."""
+    items = [
+        SlowRegexRead(
+            trigger_id=trigger.id,
+            chat_id=trigger.chat_id,
+            key_phrase=trigger.key_phrase,
+            elapsed_ms=report["elapsed_ms"],
+            reason=report["reason"],
+            reported_at=datetime.fromtimestamp(report["reported_at"], tz=UTC),
+        )
+        for trigger, report in await get_slow_regex_triggers(session)
+    ]
+    return SlowRegexListResponse(items=items)
+
+
+@router.delete("/slow-regex/{trigger_id}")
+async def dismiss_slow_regex(
+    trigger_id: int,
+    admin: Annotated[User, Depends(get_current_admin)],
+) -> dict[str, str]:
+    """Убрать триггер из списка медленных регулярок."""
+    await clear_slow_regex_reports(trigger_id)
+    return {"status": "ok"}
+
+
 @router.get("/{trigger_id}", response_model=TriggerRead)
 async def get_trigger(
     trigger_id: int,
@@ -0,0 +1,63 @@
+import logging
+from collections import deque
+
+from app.core.config import settings
+from app.core.valkey import valkey
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateDeduplicator:
+    """
+    Отсев повторных доставок апдейтов по update_id.
+
+    Telegram повторяет доставку, если вебхук отвечает медленно или реплика перезапускается.
+    Недавние update_id хранятся в кольцевом буфере в памяти и в Valkey (SET NX с TTL),
+    поэтому дубликат отбрасывается и на той же реплике, и на соседней.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._order: deque[int] = deque()
+        self._seen: set[int] = set()
+        self._size = size
+
+    def _remember(self, update_id: int) -> None:
+        self._order.append(update_id)
+        self._seen.add(update_id)
+        while len(self._order) > self._size:
+            self._seen.discard(self._order.popleft())
+
+    async def claim(self, update_id: int) -> bool:
+        """
+        Отметить апдейт как полученный.
+
+        Returns:
+            False, если апдейт уже был получен раньше
+        """
+        if update_id in self._seen:
+            return False
+
+        try:
+            claimed = await valkey.set(f"update:{update_id}", 1, nx=True, ex=settings.UPDATE_DEDUP_TTL)
+        except Exception as e:
+            # Лучше обработать дубликат, чем потерять апдейт
+            logger.warning(f"Failed to check update {update_id} for duplicates: {e!r}")
+            claimed = True
+
+        if not claimed:
+            return False
+        self._remember(update_id)
+        return True
+
+    async def release(self, update_id: int) -> None:
+        """Снять отметку, чтобы повторная доставка апдейта была обработана."""
+        if update_id in self._seen:
+            self._seen.discard(update_id)
+            self._order.remove(update_id)
+        try:
+            await valkey.delete(f"update:{update_id}")
+        except Exception as e:
+            logger.warning(f"Failed to release update {update_id}: {e!r}")
+
+
+update_dedup = UpdateDeduplicator(settings.UPDATE_DEDUP_SIZE)
@@ -1,7 +1,6 @@
 import logging
 
 from aiogram import Dispatcher, F, Router
-from aiogram.fsm.storage.redis import RedisStorage
 
 from app.bot.handlers import (
     admin,
@@ -26,32 +25,37 @@ from app.bot.middlewares.chat import ChatMiddleware
 from app.bot.middlewares.database import DatabaseMiddleware
 from app.bot.middlewares.gban import GbanMiddleware
 from app.bot.middlewares.i18n import I18nMiddleware
-from app.bot.middlewares.ignore import IgnoreMiddleware
+from app.bot.middlewares.member_status import MemberStatusMiddleware
 from app.bot.middlewares.stats import StatsMiddleware
 from app.bot.middlewares.trust import TrustMiddleware
 from app.bot.middlewares.user import UserMiddleware
 from app.bot.middlewares.user_chat import UserChatMiddleware
+from app.bot.prefetch import PrefetchingRedisStorage
 from app.core.i18n import translator_hub
 from app.core.valkey import valkey
 
 logger = logging.getLogger(__name__)
 
-storage = RedisStorage(redis=valkey)
+storage = PrefetchingRedisStorage(redis=valkey)
 dp = Dispatcher(storage=storage)
 
+# Апдейты от ботов и служебных аккаунтов отбрасываются ещё в вебхуке (app.bot.prefilter)
 dp.update.middleware(DatabaseMiddleware())
+dp.update.middleware(BannedChatMiddleware(bot))
 dp.message.outer_middleware(StatsMiddleware())
 dp.update.middleware(ChatMiddleware())
 dp.update.middleware(UserMiddleware())
 dp.update.middleware(UserChatMiddleware())
-dp.update.middleware(IgnoreMiddleware())
-dp.update.middleware(BannedChatMiddleware(bot))
 
-i18n_middleware = I18nMiddleware(translator_hub=translator_hub, valkey=valkey)
+i18n_middleware = I18nMiddleware(translator_hub=translator_hub)
 dp.message.outer_middleware(i18n_middleware)
 dp.callback_query.outer_middleware(i18n_middleware)
 dp.chat_member.outer_middleware(i18n_middleware)
 
+member_status_middleware = MemberStatusMiddleware()
+dp.chat_member.outer_middleware(member_status_middleware)
+dp.my_chat_member.outer_middleware(member_status_middleware)
+
 dp.message.outer_middleware(GbanMiddleware())
 
 dp.message.middleware(TrustMiddleware())
@@ -2,7 +2,8 @@ from aiogram.filters import BaseFilter
 from aiogram.types import Message
 from fluentogram import TranslatorRunner
 
-from app.db.models.chat import Chat
+from app.schemas.chat import ChatContext
+from app.services.member_status_service import member_status
 
 
 class IsModerationEnabled(BaseFilter):
@@ -11,7 +12,7 @@ class IsModerationEnabled(BaseFilter):
     Если выключен - просто игнорирует апдейт (silent failure).
     """
 
-    async def __call__(self, message: Message, db_chat: Chat | None = None) -> bool:
+    async def __call__(self, message: Message, db_chat: ChatContext | None = None) -> bool:
         if not db_chat:
             return False
         return db_chat.module_moderation
@@ -24,8 +25,8 @@ class HasBotRights(BaseFilter):
     """
 
     async def __call__(self, message: Message, i18n: TranslatorRunner) -> bool:
-        bot_member = await message.chat.get_member(message.bot.id)
-        if bot_member.status != "administrator":
+        bot_status = await member_status.get_status(message.bot, message.chat.id, message.bot.id)
+        if bot_status != "administrator":
             await message.answer(i18n.mod.error.no.rights(), parse_mode="HTML")
             return False
         return True
@@ -41,8 +42,7 @@ class HasUserRights(BaseFilter):
         if not message.from_user:
             return False
 
-        user_member = await message.chat.get_member(message.from_user.id)
-        if user_member.status not in ("administrator", "creator"):
+        if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
             await message.answer(i18n.mod.error.no.rights(), parse_mode="HTML")
             return False
         return True
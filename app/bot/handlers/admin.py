@@ -32,14 +32,15 @@ from app.bot.keyboards.admin import (
 from app.bot.keyboards.moderation import format_duration, get_moderation_settings_keyboard
 from app.core.config import settings
 from app.core.i18n import translator_hub
-from app.core.valkey import valkey
 from app.db.models.captcha_session import ChatCaptchaSession
 from app.db.models.chat import Chat
 from app.db.models.user import User
+from app.schemas.chat import ChatContext
 from app.services.chat_service import (
     update_chat_settings,
     update_language,
 )
+from app.services.member_status_service import member_status
 from app.services.trigger_service import (
     delete_all_triggers_by_chat,
     delete_trigger_by_key,
@@ -144,8 +145,7 @@ async def del_trigger(message: Message, command: CommandObject, session: AsyncSe
             await message.answer(i18n.trigger.missing(), parse_mode="HTML")
         return
 
-    user_member = await message.chat.get_member(message.from_user.id)
-    is_admin = user_member.status in ("administrator", "creator")
+    is_admin = await member_status.is_admin(message.bot, message.chat.id, message.from_user.id)
     is_creator = trigger.created_by == message.from_user.id
 
     if not (is_admin or is_creator):
@@ -164,10 +164,11 @@ async def del_trigger(message: Message, command: CommandObject, session: AsyncSe
 
 
 @router.message(Command("settings"))
-async def settings_command(message: Message, session: AsyncSession, i18n: TranslatorRunner, db_chat: Chat) -> None:
+async def settings_command(
+    message: Message, session: AsyncSession, i18n: TranslatorRunner, db_chat: ChatContext
+) -> None:
     """Показать настройки чата (главное меню)."""
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
         return
 
@@ -181,10 +182,11 @@ async def settings_command(message: Message, session: AsyncSession, i18n: Transl
 
 
 @router.callback_query(SettingsCallback.filter(F.action == "settings_back"))
-async def settings_back(callback: CallbackQuery, session: AsyncSession, i18n: TranslatorRunner, db_chat: Chat) -> None:
+async def settings_back(
+    callback: CallbackQuery, session: AsyncSession, i18n: TranslatorRunner, db_chat: ChatContext
+) -> None:
     """Возврат в главное меню настроек."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -219,10 +221,9 @@ def _get_captcha_menu_text(chat: Chat, i18n: TranslatorRunner) -> str:
 
 
 @router.callback_query(SettingsCallback.filter(F.action == "captcha_menu"))
-async def captcha_menu(callback: CallbackQuery, i18n: TranslatorRunner, db_chat: Chat) -> None:
+async def captcha_menu(callback: CallbackQuery, i18n: TranslatorRunner, db_chat: ChatContext) -> None:
     """Показать подменю настроек капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -240,11 +241,10 @@ async def toggle_captcha(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Переключить режим капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -265,11 +265,10 @@ async def set_captcha_type(
     callback_data: CaptchaTypeCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Установить тип капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -290,8 +289,7 @@ async def set_captcha_type(
 @router.callback_query(SettingsCallback.filter(F.action == "captcha_timeout_menu"))
 async def captcha_timeout_menu(callback: CallbackQuery, i18n: TranslatorRunner) -> None:
     """Показать выбор таймаута капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -309,11 +307,10 @@ async def set_captcha_timeout(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Установить таймаут капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -338,11 +335,10 @@ async def captcha_attempts_incr(
     callback: CallbackQuery,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Увеличить максимальное количество попыток капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -366,11 +362,10 @@ async def captcha_attempts_decr(
     callback: CallbackQuery,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Уменьшить максимальное количество попыток капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -392,8 +387,7 @@ async def captcha_attempts_decr(
 @router.callback_query(SettingsCallback.filter(F.action == "captcha_ban_duration_menu"))
 async def captcha_ban_duration_menu(callback: CallbackQuery, i18n: TranslatorRunner) -> None:
     """Показать выбор длительности бана за провал капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -411,11 +405,10 @@ async def set_captcha_ban_duration(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Установить длительность бана за провал капчи."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -436,10 +429,9 @@ async def set_captcha_ban_duration(
 
 
 @router.callback_query(SettingsCallback.filter(F.action == "triggers_menu"))
-async def triggers_menu(callback: CallbackQuery, i18n: TranslatorRunner, db_chat: Chat) -> None:
+async def triggers_menu(callback: CallbackQuery, i18n: TranslatorRunner, db_chat: ChatContext) -> None:
     """Показать подменю настроек триггеров."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -466,11 +458,10 @@ async def toggle_admins_only(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Переключить режим 'только админы'."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -501,11 +492,10 @@ async def toggle_triggers(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Переключить модуль триггеров."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -536,11 +526,10 @@ async def toggle_moderation(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Переключить модуль модерации."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -561,8 +550,7 @@ async def toggle_moderation(
 @router.callback_query(SettingsCallback.filter(F.action == "clear_ask"))
 async def clear_ask(callback: CallbackQuery, i18n: TranslatorRunner) -> None:
     """Запрос подтверждения очистки всех триггеров."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -574,10 +562,11 @@ async def clear_ask(callback: CallbackQuery, i18n: TranslatorRunner) -> None:
 
 
 @router.callback_query(SettingsCallback.filter(F.action == "clear_confirm"))
-async def clear_confirm(callback: CallbackQuery, session: AsyncSession, i18n: TranslatorRunner, db_chat: Chat) -> None:
+async def clear_confirm(
+    callback: CallbackQuery, session: AsyncSession, i18n: TranslatorRunner, db_chat: ChatContext
+) -> None:
     """Подтверждение очистки всех триггеров."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -606,8 +595,7 @@ async def clear_confirm(callback: CallbackQuery, session: AsyncSession, i18n: Tr
 async def change_timezone(callback: CallbackQuery, i18n: TranslatorRunner, state: FSMContext) -> None:
     """Изменить таймзону."""
     await state.clear()
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -682,11 +670,10 @@ async def set_timezone(
     callback_data: SettingsCallback,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """Установить таймзону."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -704,8 +691,7 @@ async def set_timezone(
 async def custom_timezone(callback: CallbackQuery, i18n: TranslatorRunner, state: FSMContext) -> None:
     """Ввести кастомную таймзону."""
     await state.set_state(SettingsStates.waiting_for_timezone)
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -730,12 +716,11 @@ async def custom_timezone(callback: CallbackQuery, i18n: TranslatorRunner, state
 
 @router.message(SettingsStates.waiting_for_timezone, F.text.regexp(r"^[A-Za-z]+/[A-Za-z_]+$"))
 async def handle_custom_timezone(
-    message: Message, session: AsyncSession, i18n: TranslatorRunner, db_chat: Chat, state: FSMContext
+    message: Message, session: AsyncSession, i18n: TranslatorRunner, db_chat: ChatContext, state: FSMContext
 ) -> None:
     """Обработать введенную таймзону."""
     await state.clear()
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         return
 
     timezone = message.text.strip()
@@ -753,8 +738,7 @@ async def handle_custom_timezone(
 @router.message(Command("lang"))
 async def lang_command(message: Message, i18n: TranslatorRunner) -> None:
     """Команда выбора языка."""
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
         return
 
@@ -770,8 +754,7 @@ async def on_language_select(
     callback: CallbackQuery, callback_data: LanguageCallback, session: AsyncSession, i18n: TranslatorRunner
 ) -> None:
     """Обработчик выбора языка."""
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -780,8 +763,6 @@ async def on_language_select(
 
     await update_language(session, chat_id, lang_code)
 
-    await valkey.set(f"lang:{chat_id}", lang_code, ex=3600)
-
     new_i18n = translator_hub.get_translator_by_locale(lang_code)
 
     lang_name = new_i18n.lang.display.name()
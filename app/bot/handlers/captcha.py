@@ -17,9 +17,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.bot.instance import bot
 from app.core.broker import broker, delayed_exchange
 from app.db.models.captcha_session import ChatCaptchaSession
-from app.db.models.chat import Chat
 from app.db.models.user import User
 from app.services.captcha_service import CaptchaResult, CaptchaService
+from app.services.chat_context_service import get_chat_context
 from app.services.welcome_service import send_welcome_message
 
 logger = logging.getLogger(__name__)
@@ -109,7 +109,7 @@ async def _handle_success(callback: CallbackQuery, session: AsyncSession, i18n:
     with suppress(Exception):
         await callback.message.delete()
 
-    db_chat = await session.get(Chat, chat.id)
+    db_chat = await get_chat_context(session, chat.id)
 
     sent_welcome = False
     if db_chat:
@@ -167,7 +167,7 @@ async def _handle_fail(callback: CallbackQuery, session: AsyncSession, i18n: Tra
     chat = callback.message.chat
     user = callback.from_user
 
-    db_chat = await session.get(Chat, chat.id)
+    db_chat = await get_chat_context(session, chat.id)
     ban_duration = db_chat.captcha_ban_duration if db_chat else 259200
 
     await callback.answer(i18n.captcha.fail(), show_alert=True)
@@ -18,6 +18,7 @@ from app.db.models.user_chat import UserChat
 from app.services.captcha_service import CaptchaService
 from app.services.chat_service import get_or_create_chat
 from app.services.gban_service import GbanService
+from app.services.upsert_cache import upsert_coalescer
 from app.services.user_service import get_or_create_user
 from app.services.welcome_service import send_welcome_message
 
@@ -81,6 +82,7 @@ async def on_chat_member_update(event: ChatMemberUpdated, session: AsyncSession,
         user_chat.updated_at = datetime.now().astimezone()
 
     await session.commit()
+    upsert_coalescer.forget_membership(user.id, chat.id)
     logger.info(f"Updated UserChat {user.id} in {chat.id}: active={is_active}, admin={is_admin}")
 
     is_joining = old_status in ("left", "kicked") and new_status in ("member", "restricted")
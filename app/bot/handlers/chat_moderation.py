@@ -13,7 +13,8 @@ from app.bot.keyboards.moderation import (
     get_moderation_settings_keyboard,
 )
 from app.core.time_util import format_dt, parse_time_string
-from app.db.models.chat import Chat
+from app.schemas.chat import ChatContext
+from app.services.member_status_service import member_status
 from app.services.moderation_service import ModerationService
 
 router = Router()
@@ -188,7 +189,7 @@ async def cmd_warn(
     message: Message,
     command: CommandObject,
     session: AsyncSession,
-    db_chat: Chat,
+    db_chat: ChatContext,
     i18n: TranslatorRunner,
 ) -> None:
     user_id, user_name = await get_target_user(message)
@@ -244,7 +245,7 @@ async def cmd_warn(
 
 
 @router.message(Command("unwarn"), IsModerationEnabled(), HasUserRights())
-async def cmd_unwarn(message: Message, session: AsyncSession, db_chat: Chat, i18n: TranslatorRunner) -> None:
+async def cmd_unwarn(message: Message, session: AsyncSession, db_chat: ChatContext, i18n: TranslatorRunner) -> None:
     user_id, _user_name = await get_target_user(message)
     if not user_id:
         return
@@ -263,7 +264,7 @@ async def cmd_unwarn(message: Message, session: AsyncSession, db_chat: Chat, i18
 
 
 @router.message(Command("warns"), IsModerationEnabled())
-async def cmd_warns(message: Message, session: AsyncSession, db_chat: Chat, i18n: TranslatorRunner) -> None:
+async def cmd_warns(message: Message, session: AsyncSession, db_chat: ChatContext, i18n: TranslatorRunner) -> None:
     user_id, user_name = await get_target_user(message)
     if not user_id:
         user_id = message.from_user.id
@@ -294,10 +295,9 @@ async def cmd_warns(message: Message, session: AsyncSession, db_chat: Chat, i18n
 
 @router.callback_query(ModerationSettingsCallback.filter(F.action == "menu"))
 async def on_moderation_menu(
-    callback: CallbackQuery, session: AsyncSession, db_chat: Chat, i18n: TranslatorRunner
+    callback: CallbackQuery, session: AsyncSession, db_chat: ChatContext, i18n: TranslatorRunner
 ) -> None:
-    user_member = await callback.message.chat.get_member(callback.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(callback.bot, callback.message.chat.id, callback.from_user.id):
         await callback.answer(i18n.error.no.rights(), show_alert=True)
         return
 
@@ -315,7 +315,7 @@ async def on_limit_change(
     callback: CallbackQuery,
     callback_data: ModerationSettingsCallback,
     session: AsyncSession,
-    db_chat: Chat,
+    db_chat: ChatContext,
     i18n: TranslatorRunner,
 ) -> None:
     service = ModerationService(session)
@@ -335,7 +335,7 @@ async def on_limit_change(
 
 @router.callback_query(ModerationSettingsCallback.filter(F.action == "punishment"))
 async def on_punishment_toggle(
-    callback: CallbackQuery, session: AsyncSession, db_chat: Chat, i18n: TranslatorRunner
+    callback: CallbackQuery, session: AsyncSession, db_chat: ChatContext, i18n: TranslatorRunner
 ) -> None:
     service = ModerationService(session)
     new_punishment = "mute" if db_chat.warn_punishment == "ban" else "ban"
@@ -351,7 +351,7 @@ async def on_gban_toggle(
     callback: CallbackQuery,
     callback_data: ModerationSettingsCallback,
     session: AsyncSession,
-    db_chat: Chat,
+    db_chat: ChatContext,
     i18n: TranslatorRunner,
 ) -> None:
     service = ModerationService(session)
@@ -367,7 +367,7 @@ async def on_duration_action(
     callback: CallbackQuery,
     callback_data: ModerationSettingsCallback,
     session: AsyncSession,
-    db_chat: Chat,
+    db_chat: ChatContext,
     i18n: TranslatorRunner,
 ) -> None:
     if callback_data.value == "menu":
@@ -9,9 +9,10 @@ from fluentogram import TranslatorRunner
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.models.chat import Chat
 from app.db.models.trigger import AccessLevel, MatchType
 from app.db.models.user import User
+from app.schemas.chat import ChatContext
+from app.services.member_status_service import member_status
 from app.services.template_service import validate_template
 from app.services.trigger_service import create_trigger
 
@@ -25,7 +26,7 @@ async def add_trigger(
     command: CommandObject,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
     user: User,
 ) -> None:
     """Добавление нового триггера."""
@@ -90,8 +91,7 @@ async def add_trigger(
     if "-t" in flags or "--template" in flags:
         is_template = True
 
-    user_member = await message.chat.get_member(message.from_user.id)
-    is_admin = user_member.status in ("administrator", "creator")
+    is_admin = await member_status.is_admin(message.bot, message.chat.id, message.from_user.id)
 
     if db_chat.admins_only_add and not is_admin:
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
@@ -132,6 +132,8 @@ async def add_trigger(
             i18n.trigger.added(trigger_key=html.escape(key_phrase)),
             parse_mode="HTML",
         )
+    except ValueError as e:
+        await message.answer(i18n.trigger.regex.error(error=html.escape(str(e))), parse_mode="HTML")
     except Exception:
         logger.exception("Error adding trigger")
         await message.answer(i18n.trigger.add.error(), parse_mode="HTML")
@@ -14,6 +14,7 @@ from app.bot.keyboards.triggers import (
 )
 from app.db.models.trigger import AccessLevel, MatchType, Trigger
 from app.services import trigger_service
+from app.services.member_status_service import member_status
 
 router = Router()
 
@@ -130,8 +131,7 @@ async def on_trigger_edit(
         await on_triggers_list(callback, TriggersListCallback(page=1), session, i18n)
         return
 
-    member = await bot.get_chat_member(chat_id, user_id)
-    is_admin = member.status in ["creator", "administrator"]
+    is_admin = await member_status.is_admin(bot, chat_id, user_id)
     is_creator = trigger.created_by == user_id
 
     if action != "open" and not (is_admin or is_creator):
@@ -150,7 +150,11 @@ async def on_trigger_edit(
         await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
 
     elif action == "toggle_case":
-        await trigger_service.update_trigger(session, trigger.id, is_case_sensitive=not trigger.is_case_sensitive)
+        try:
+            await trigger_service.update_trigger(session, trigger.id, is_case_sensitive=not trigger.is_case_sensitive)
+        except ValueError as e:
+            await callback.answer(i18n.trigger.regex.error(error=str(e)), show_alert=True)
+            return
         trigger = await trigger_service.get_trigger_by_id(session, trigger_id)
         text = format_trigger_details(trigger, i18n, creator_name)
         keyboard = get_trigger_edit_keyboard(trigger, i18n)
@@ -163,7 +167,11 @@ async def on_trigger_edit(
             MatchType.REGEXP: MatchType.EXACT,
         }.get(trigger.match_type, MatchType.EXACT)
 
-        await trigger_service.update_trigger(session, trigger.id, match_type=new_type)
+        try:
+            await trigger_service.update_trigger(session, trigger.id, match_type=new_type)
+        except ValueError as e:
+            await callback.answer(i18n.trigger.regex.error(error=str(e)), show_alert=True)
+            return
         trigger = await trigger_service.get_trigger_by_id(session, trigger_id)
         text = format_trigger_details(trigger, i18n, creator_name)
         keyboard = get_trigger_edit_keyboard(trigger, i18n)
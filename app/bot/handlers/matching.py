@@ -1,29 +1,29 @@
-import asyncio
 import logging
+from functools import partial
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from aiogram import Router
+from aiogram.methods import TelegramMethod
 from aiogram.types import Message
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.bot.outbound import outbound
 from app.core.time_util import get_timezone
-from app.db.models.chat import Chat
-from app.db.models.chat_variable import ChatVariable
-from app.db.models.trigger import AccessLevel, Trigger
+from app.db.models.trigger import AccessLevel
+from app.schemas.chat import ChatContext
+from app.schemas.trigger import TriggerSnapshot
+from app.services.chat_variable_service import get_vars
+from app.services.member_status_service import member_status
+from app.services.stats_service import StatsService
 from app.services.template_service import get_render_context, render_template
-from app.services.trigger_service import (
-    find_matches,
-    get_triggers_by_chat,
-    increment_usage,
-)
+from app.services.trigger_service import get_trigger_matcher
 
 logger = logging.getLogger(__name__)
 router = Router()
 
 
 async def _check_access(
-    trigger: Trigger,
+    trigger: TriggerSnapshot,
     message: Message,
 ) -> bool:
     """
@@ -39,37 +39,18 @@ async def _check_access(
     if trigger.access_level == AccessLevel.ALL:
         return True
 
-    member = await message.chat.get_member(message.from_user.id)
+    status = await member_status.get_status(message.bot, message.chat.id, message.from_user.id)
 
     if trigger.access_level == AccessLevel.ADMINS:
-        return member.status in ("administrator", "creator")
+        return status in ("administrator", "creator")
 
     if trigger.access_level == AccessLevel.OWNER:
-        return member.status == "creator"
+        return status == "creator"
 
     logger.warning(f"Unknown access level: {trigger.access_level}")
     return False
 
 
-async def _get_chat_variables(
-    session: AsyncSession,
-    chat_id: int,
-) -> dict[str, str]:
-    """
-    Получает переменные чата из базы данных.
-
-    Args:
-        session: Сессия базы данных
-        chat_id: ID чата
-
-    Returns:
-        Словарь переменных чата
-    """
-    vars_stmt = select(ChatVariable).where(ChatVariable.chat_id == chat_id)
-    vars_result = await session.execute(vars_stmt)
-    return {var.key: var.value for var in vars_result.scalars()}
-
-
 def _get_timezone(chat_timezone: str | None) -> ZoneInfo:
     """
     Получает часовой пояс для чата.
@@ -89,59 +70,56 @@ def _get_timezone(chat_timezone: str | None) -> ZoneInfo:
 
 
 def _render_template_field(
-    content: dict,
+    template: str,
     field: str,
     context: dict,
     trigger_id: int,
-) -> None:
+) -> str:
     """
     Рендерит шаблонное поле контента.
 
     Args:
-        content: Словарь контента
-        field: Имя поля для рендеринга
+        template: Исходный текст шаблона
+        field: Имя поля для логирования
         context: Контекст для шаблона
         trigger_id: ID триггера для логирования
-    """
-    if not content.get(field):
-        return
 
+    Returns:
+        Отрендеренный текст или исходный при ошибке
+    """
     try:
-        content[field] = render_template(content[field], context)
+        return render_template(template, context)
     except Exception as e:
         logger.warning(f"Error rendering template {field} for trigger {trigger_id}: {e}")
+        return template
 
 
-async def _prepare_content(
-    content: dict,
-    trigger: Trigger,
+async def _prepare_send_method(
+    trigger: TriggerSnapshot,
     message: Message,
-    db_chat: Chat,
+    db_chat: ChatContext,
     session: AsyncSession,
-) -> dict:
+) -> TelegramMethod:
     """
-    Подготавливает контент для отправки.
+    Подготавливает метод отправки ответа триггера.
+    Заготовка из снимка переиспользуется, перерисовываются только шаблонные поля.
 
     Args:
-        content: Исходный контент триггера
-        trigger: Объект триггера
+        trigger: Снимок триггера
         message: Сообщение пользователя
         db_chat: Объект чата из БД
         session: Сессия базы данных
 
     Returns:
-        Параметры для отправки сообщения
+        Метод Telegram API, готовый к отправке
     """
-    send_kwargs: dict = {}
+    method = trigger.send_method
+    update: dict = {"chat_id": message.chat.id}
 
     if not trigger.is_template:
-        return send_kwargs
-
-    send_kwargs["parse_mode"] = "HTML"
-    content.pop("entities", None)
-    content.pop("caption_entities", None)
+        return method.model_copy(update=update)
 
-    chat_vars = await _get_chat_variables(session, message.chat.id)
+    chat_vars = await get_vars(session, message.chat.id)
     tz = _get_timezone(db_chat.timezone)
 
     context = get_render_context(
@@ -151,52 +129,24 @@ async def _prepare_content(
         timezone=tz,
     )
 
-    _render_template_field(content, "text", context, trigger.id)
-    _render_template_field(content, "caption", context, trigger.id)
+    fields = type(method).model_fields
+    if "parse_mode" in fields:
+        update["parse_mode"] = "HTML"
+    for field, entities_field in (("text", "entities"), ("caption", "caption_entities")):
+        if entities_field in fields:
+            update[entities_field] = None
+        template = trigger.content.get(field)
+        if template and field in fields:
+            update[field] = _render_template_field(template, field, context, trigger.id)
 
-    return send_kwargs
-
-
-async def _send_trigger_message(
-    content: dict,
-    send_kwargs: dict,
-    message: Message,
-    trigger: Trigger,
-    session: AsyncSession,
-) -> None:
-    """
-    Отправляет сообщение триггера в чат.
-
-    Args:
-        content: Контент для отправки
-        send_kwargs: Дополнительные параметры отправки
-        message: Исходное сообщение пользователя
-        trigger: Объект триггера
-        session: Сессия базы данных
-    """
-    try:
-        saved_msg = Message.model_validate(content)
-        saved_msg._bot = message.bot
-
-        if saved_msg.dice:
-            await message.bot.send_dice(
-                chat_id=message.chat.id,
-                emoji=saved_msg.dice.emoji,
-                **send_kwargs,
-            )
-        else:
-            await saved_msg.send_copy(chat_id=message.chat.id, **send_kwargs)
-
-        await increment_usage(session, trigger.id)
-    except Exception:
-        logger.exception("Error sending trigger message")
+    return method.model_copy(update=update)
 
 
 @router.message()
 async def check_triggers(
     message: Message,
     session: AsyncSession,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """
     Проверяет сообщение на наличие совпадающих триггеров и отправляет ответы.
@@ -207,24 +157,31 @@ async def check_triggers(
     if not db_chat.module_triggers:
         return
 
-    triggers = await get_triggers_by_chat(session, message.chat.id)
-    if not triggers:
+    matcher = await get_trigger_matcher(session, message.chat.id)
+    if not matcher:
         return
 
-    matches = await find_matches(triggers, message.text)
+    matches = await matcher.match(message.text)
     if not matches:
         return
 
-    for i, match in enumerate(matches):
-        if i > 0:
-            await asyncio.sleep(0.5)
+    for match in matches:
+        if match.send_method is None:
+            continue
 
         if not await _check_access(match, message):
             continue
 
         try:
-            content = match.content.copy()
-            send_kwargs = await _prepare_content(content, match, message, db_chat, session)
-            await _send_trigger_message(content, send_kwargs, message, match, session)
+            method = await _prepare_send_method(match, message, db_chat, session)
         except Exception:
             logger.exception("Error processing trigger")
+            continue
+
+        # Отправкой и паузами между ответами занимается планировщик, обработчик не ждёт
+        outbound.submit(
+            message.bot,
+            message.chat.id,
+            method,
+            on_sent=partial(StatsService.record_trigger_usage, match.id),
+        )
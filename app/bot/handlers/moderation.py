@@ -12,12 +12,14 @@ from app.core.broker import broker
 from app.core.config import settings
 from app.core.database import engine
 from app.core.i18n import ROOT_LOCALE, translator_hub
-from app.db.models.chat import BannedChat, Chat
+from app.db.models.chat import BannedChat
 from app.db.models.moderation_history import ModerationStep
 from app.db.models.trigger import ModerationStatus, Trigger
 from app.schemas.moderation import ModerationAlert
+from app.services.banned_chat_registry import banned_chats
+from app.services.chat_context_service import get_chat_context
 from app.services.moderation_history_service import add_history_step
-from app.services.trigger_service import get_file_info_from_content
+from app.services.trigger_service import get_file_info_from_content, invalidate_triggers_cache
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -222,7 +224,7 @@ async def delete_trigger(callback: CallbackQuery, session: AsyncSession) -> None
         chat_id = trigger.chat_id
         key_phrase = trigger.key_phrase
 
-        chat = await session.get(Chat, chat_id)
+        chat = await get_chat_context(session, chat_id)
         lang = chat.language_code if chat else ROOT_LOCALE
         i18n = translator_hub.get_translator_by_locale(lang)
 
@@ -235,6 +237,7 @@ async def delete_trigger(callback: CallbackQuery, session: AsyncSession) -> None
         )
         await session.delete(trigger)
         await session.commit()
+        await invalidate_triggers_cache(chat_id)
 
         await callback.answer("Trigger deleted")
         await update_moderation_message(callback.message, f"💀 <b>Deleted by {user_name}</b>")
@@ -265,12 +268,11 @@ async def ban_chat(callback: CallbackQuery, session: AsyncSession) -> None:
         chat_id=chat_id,
         reason=f"Banned via moderation trigger {trigger_id} by {user_name}",
     )
-    session.add(banned)
-
     try:
-        await session.flush()
+        # Savepoint: откатывается только вставка бана, остальная транзакция апдейта сохраняется
+        async with session.begin_nested():
+            session.add(banned)
     except IntegrityError:
-        await session.rollback()
         logger.info(f"Chat {chat_id} is already banned. Proceeding to delete trigger.")
 
     trigger = await session.get(Trigger, trigger_id)
@@ -283,6 +285,8 @@ async def ban_chat(callback: CallbackQuery, session: AsyncSession) -> None:
         await session.delete(trigger)
 
     await session.commit()
+    await banned_chats.add(chat_id)
+    await invalidate_triggers_cache(chat_id)
 
     try:
         await bot.leave_chat(chat_id)
@@ -5,6 +5,7 @@ from fluentogram import TranslatorRunner
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.chat_variable_service import del_var, get_vars, set_var, validate_key
+from app.services.member_status_service import member_status
 
 router = Router()
 
@@ -14,8 +15,7 @@ async def set_var_command(
     message: Message, command: CommandObject, session: AsyncSession, i18n: TranslatorRunner
 ) -> None:
     """Установить переменную чата."""
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
         return
 
@@ -43,8 +43,7 @@ async def del_var_command(
     message: Message, command: CommandObject, session: AsyncSession, i18n: TranslatorRunner
 ) -> None:
     """Удалить переменную чата."""
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
         return
 
@@ -64,8 +63,7 @@ async def del_var_command(
 @router.message(Command("vars"))
 async def list_vars_command(message: Message, session: AsyncSession, i18n: TranslatorRunner) -> None:
     """Показать список переменных чата."""
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
         return
 
@@ -1,3 +1,4 @@
+import html
 import logging
 
 from aiogram import Router
@@ -8,8 +9,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.instance import bot
 from app.core.time_util import parse_time_string
-from app.db.models.chat import Chat
+from app.schemas.chat import ChatContext
 from app.services.chat_service import update_chat_settings
+from app.services.member_status_service import member_status
+from app.services.template_service import validate_template
 from app.services.welcome_service import send_welcome_message
 
 logger = logging.getLogger(__name__)
@@ -22,7 +25,7 @@ async def welcome_command(
     command: CommandObject,
     session: AsyncSession,
     i18n: TranslatorRunner,
-    db_chat: Chat,
+    db_chat: ChatContext,
 ) -> None:
     """
     Управление приветствиями.
@@ -30,8 +33,7 @@ async def welcome_command(
     /welcome delete / off
     /welcome test
     """
-    user_member = await message.chat.get_member(message.from_user.id)
-    if user_member.status not in ("administrator", "creator"):
+    if not await member_status.is_admin(message.bot, message.chat.id, message.from_user.id):
         await message.answer(i18n.error.no.rights(), parse_mode="HTML")
         return
 
@@ -69,6 +71,14 @@ async def welcome_command(
             elif "caption" in msg_data:
                 msg_data["caption"] = reply.html_text
 
+        template_text = msg_data.get("text") or msg_data.get("caption")
+        if template_text:
+            try:
+                validate_template(html.unescape(template_text))
+            except ValueError as e:
+                await message.answer(i18n.trigger.validation.error(error=html.escape(str(e))), parse_mode="HTML")
+                return
+
         await update_chat_settings(
             session, db_chat.id, welcome_enabled=True, welcome_message=msg_data, welcome_delete_timeout=timeout
         )
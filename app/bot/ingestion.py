@@ -0,0 +1,264 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from app.bot.prefetch import collect_update_keys
+from app.bot.prefilter import event_chat_id
+from app.core.broker import broker, update_partition_queue, updates_exchange
+from app.core.config import settings
+from app.core.valkey_pipeline import prefetch
+
+logger = logging.getLogger(__name__)
+
+CLOSE_TIMEOUT = 10
+# Сколько самых загруженных чатов показывать в метриках
+TOP_CHATS_LIMIT = 10
+
+
+def _ordering_key(update_data: dict[str, Any]) -> int | None:
+    """Ключ упорядочивания апдейта: чат, а для апдейтов без чата (inline, опросы) — пользователь."""
+    event = next((value for key, value in update_data.items() if key != "update_id"), None)
+    if not isinstance(event, dict):
+        return None
+
+    chat_id = event_chat_id(event)
+    if chat_id is not None:
+        return chat_id
+    user = event.get("from") or event.get("user")
+    return user.get("id") if user else None
+
+
+class _ChatLane:
+    """Очередь апдейтов одного чата и её учёт для справедливого планирования."""
+
+    __slots__ = ("busy", "overflows", "updates", "vtime")
+
+    def __init__(self, vtime: float) -> None:
+        # Future есть у апдейтов из партиции: он завершается после обработки, и только тогда сообщение подтверждается
+        self.updates: deque[tuple[dict[str, Any], asyncio.Future[None] | None]] = deque()
+        # Виртуальное время: суммарное время обработки апдейтов чата с момента появления очереди
+        self.vtime = vtime
+        self.busy = 0.0
+        self.overflows = 0
+
+
+class UpdateQueue:
+    """
+    Очередь входящих апдейтов вебхука.
+
+    Вебхук кладёт сырой апдейт в ограниченную очередь и сразу отвечает Telegram,
+    а обработку выполняют WEBHOOK_WORKERS фоновых задач. Апдейты одного чата
+    обрабатываются строго по очереди, разные чаты — параллельно, и чат с ожидающими
+    апдейтами занимает не больше одного обработчика.
+
+    Между чатами обработчики делятся справедливо (weighted fair queueing): первым
+    берётся чат с наименьшим виртуальным временем, которое растёт на время обработки
+    каждого его апдейта. Чат, апдейты которого обрабатываются дольше или приходят
+    чаще, уступает очередь тихим чатам, и их задержка не растёт во время рейда.
+
+    При переполнении общей очереди (WEBHOOK_QUEUE_SIZE) действует WEBHOOK_OVERFLOW_POLICY:
+    reject — вернуть Telegram ошибку, чтобы он повторил доставку позже; drop_oldest —
+    вытеснить самый старый апдейт этого чата; drop_new — отбросить новый.
+    Переполнение очереди одного чата (WEBHOOK_CHAT_QUEUE_SIZE) не должно задерживать
+    остальные чаты, поэтому апдейты сбрасываются только в его очереди: при drop_new
+    отбрасывается новый, иначе вытесняется самый старый.
+    """
+
+    def __init__(self) -> None:
+        self._lanes: dict[int | None, _ChatLane] = {}
+        self._ready: asyncio.PriorityQueue[tuple[float, int, int | None]] = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        # Виртуальное время последнего взятого в работу чата; с него начинают новые чаты
+        self._vtime = 0.0
+        self._size = 0
+        self._workers: list[asyncio.Task] = []
+        self.accepted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Обрабатываются ли апдейты фоновыми задачами (иначе — прямо в запросе вебхука)."""
+        return settings.WEBHOOK_WORKERS > 0
+
+    def start(self, dispatcher: Dispatcher, bot: Bot) -> None:
+        """Запустить обработчиков очереди."""
+        if not self.enabled or self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._work(dispatcher, bot), name=f"webhook-worker-{i}")
+            for i in range(settings.WEBHOOK_WORKERS)
+        ]
+
+    def put(self, update_data: dict[str, Any]) -> bool:
+        """
+        Поставить апдейт в очередь его чата.
+
+        Returns:
+            False, если апдейт не принят и Telegram должен повторить доставку
+        """
+        key = _ordering_key(update_data)
+        lane = self._lanes.get(key)
+
+        chat_full = lane is not None and len(lane.updates) >= settings.WEBHOOK_CHAT_QUEUE_SIZE
+        if chat_full or self._size >= settings.WEBHOOK_QUEUE_SIZE:
+            if lane is not None:
+                lane.overflows += 1
+            policy = settings.WEBHOOK_OVERFLOW_POLICY
+            if policy == "reject":
+                if not chat_full:
+                    self.rejected += 1
+                    return False
+                # Ошибка вебхука задержала бы повторную доставку апдейтов всех чатов
+                policy = "drop_oldest"
+            self.dropped += 1
+            if policy == "drop_new" or lane is None or not lane.updates:
+                logger.warning(f"Webhook queue is full, dropping new update for {key}")
+                return True
+            self._discard(lane.updates.popleft())
+            logger.warning(f"Webhook queue is full, dropping oldest update for {key}")
+
+        self._enqueue(key, update_data, None)
+        return True
+
+    def submit(self, update_data: dict[str, Any]) -> asyncio.Future[None]:
+        """
+        Поставить апдейт в очередь его чата.
+        Постановка синхронная, поэтому апдейты встают в очередь в порядке вызовов.
+        Ограничения длины очереди не применяются: число апдейтов в работе ограничивает вызывающий.
+
+        Returns:
+            Future, который завершится после обработки апдейта
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(_ordering_key(update_data), update_data, future)
+        return future
+
+    def _enqueue(self, key: int | None, update_data: dict[str, Any], future: asyncio.Future[None] | None) -> None:
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _ChatLane(self._vtime)
+            self._schedule(key, lane)
+        lane.updates.append((update_data, future))
+        self._size += 1
+        self.accepted += 1
+
+    def _discard(self, item: tuple[dict[str, Any], asyncio.Future[None] | None]) -> None:
+        _, future = item
+        if future is not None and not future.done():
+            future.cancel()
+        self._size -= 1
+
+    def _schedule(self, key: int | None, lane: _ChatLane) -> None:
+        self._ready.put_nowait((lane.vtime, next(self._sequence), key))
+
+    async def _work(self, dispatcher: Dispatcher, bot: Bot) -> None:
+        while True:
+            vtime, _, key = await self._ready.get()
+            self._vtime = max(self._vtime, vtime)
+            lane = self._lanes[key]
+            update_data, future = lane.updates.popleft()
+            self._size -= 1
+            started_at = time.monotonic()
+            try:
+                await process_update(dispatcher, bot, update_data)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception(f"Error processing queued update for {key}")
+            finally:
+                elapsed = time.monotonic() - started_at
+                lane.vtime += elapsed
+                lane.busy += elapsed
+                if future is not None and not future.done():
+                    # Ошибка обработчика не исправится повторной доставкой, а при остановке
+                    # обработчика сообщение партиции не подтверждается и будет доставлено снова
+                    if asyncio.current_task().cancelling():
+                        future.cancel()
+                    else:
+                        future.set_result(None)
+                # Пока апдейт обрабатывается, новые апдейты чата только копятся в его очереди
+                if lane.updates:
+                    self._schedule(key, lane)
+                else:
+                    del self._lanes[key]
+                self._ready.task_done()
+
+    def stats(self) -> dict[str, Any]:
+        """Метрики очереди для мониторинга."""
+        top_chats = heapq.nlargest(TOP_CHATS_LIMIT, self._lanes.items(), key=lambda item: item[1].busy)
+        return {
+            "size": self._size,
+            "capacity": settings.WEBHOOK_QUEUE_SIZE,
+            "chats": len(self._lanes),
+            "workers": len(self._workers),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "failed": self.failed,
+            "throttled_chats": [
+                {
+                    "chat_id": key,
+                    "pending": len(lane.updates),
+                    "busy_seconds": round(lane.busy, 3),
+                    "overflows": lane.overflows,
+                }
+                for key, lane in top_chats
+            ],
+        }
+
+    async def close(self) -> None:
+        """Дообработать очередь (не дольше CLOSE_TIMEOUT) и остановить обработчиков."""
+        if not self._workers:
+            return
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._ready.join(), CLOSE_TIMEOUT)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Апдейты вебхука Telegram уже подтвердил и не доставит повторно, апдейты партиций вернутся в RabbitMQ
+        lost = 0
+        for lane in self._lanes.values():
+            for item in lane.updates:
+                lost += item[1] is None
+                self._discard(item)
+        self._lanes.clear()
+        if lost:
+            logger.error(f"Webhook queue closed with {lost} unprocessed updates, they are lost")
+            self.dropped += lost
+
+
+async def process_update(dispatcher: Dispatcher, bot: Bot, update_data: dict[str, Any]) -> None:
+    """Разобрать сырой апдейт и передать его диспетчеру."""
+    update = Update.model_validate(update_data, context={"bot": bot})
+    async with prefetch(collect_update_keys(dispatcher, bot, update)):
+        await dispatcher.feed_update(bot, update)
+
+
+async def declare_partitions() -> None:
+    """Объявить обменник и очереди партиций, чтобы апдейты не терялись до запуска обработчиков."""
+    exchange = await broker.declare_exchange(updates_exchange)
+    for partition in range(settings.BOT_PARTITIONS):
+        queue = await broker.declare_queue(update_partition_queue(partition))
+        await queue.bind(exchange, routing_key="1")
+
+
+async def publish_update(update_data: dict[str, Any]) -> None:
+    """Передать апдейт в партицию его чата."""
+    await broker.publish(update_data, exchange=updates_exchange, routing_key=str(_ordering_key(update_data)))
+
+
+update_queue = UpdateQueue()
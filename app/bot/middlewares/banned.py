@@ -4,11 +4,9 @@ from typing import Any
 
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import Update
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.valkey import valkey
-from app.db.models.chat import BannedChat
+from app.services.banned_chat_registry import banned_chats
 
 
 class BannedChatMiddleware(BaseMiddleware):
@@ -32,24 +30,14 @@ class BannedChatMiddleware(BaseMiddleware):
         if not chat_id:
             return await handler(event, data)
 
-        is_banned = await valkey.get(f"banned_chat:{chat_id}")
-        if is_banned:
+        session: AsyncSession = data.get("session")
+        if not banned_chats.loaded and session:
+            await banned_chats.load(session)
+
+        if banned_chats.is_banned(chat_id):
             if event.my_chat_member:
                 with contextlib.suppress(Exception):
                     await self.bot.leave_chat(chat_id)
             return None
 
-        session: AsyncSession = data.get("session")
-        if session:
-            stmt = select(BannedChat).where(BannedChat.chat_id == chat_id)
-            result = await session.execute(stmt)
-            banned = result.scalars().first()
-
-            if banned:
-                await valkey.set(f"banned_chat:{chat_id}", "1", ex=3600)
-                if event.my_chat_member:
-                    with contextlib.suppress(Exception):
-                        await self.bot.leave_chat(chat_id)
-                return None
-
         return await handler(event, data)
@@ -4,7 +4,7 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import Chat, TelegramObject, Update
 
-from app.services.chat_service import get_or_create_chat
+from app.services.chat_service import sync_chat
 
 
 class ChatMiddleware(BaseMiddleware):
@@ -34,7 +34,7 @@ class ChatMiddleware(BaseMiddleware):
             if chat.photo:
                 photo_id = chat.photo.big_file_id
 
-            db_chat = await get_or_create_chat(
+            db_chat = await sync_chat(
                 session=session,
                 chat_id=chat.id,
                 title=chat.title,
@@ -4,11 +4,17 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
-from app.core.database import async_session_factory
+from app.core.database import UNIT_OF_WORK, async_session_factory, has_uncommitted_changes
 
 
 class DatabaseMiddleware(BaseMiddleware):
-    """Middleware для внедрения сессии базы данных."""
+    """
+    Middleware для внедрения сессии базы данных.
+    Сессия берёт соединение из пула только при первом запросе, поэтому апдейты,
+    отброшенные до обращения к БД, пул не занимают.
+    Сессия работает как единица работы: middleware и сервисы присоединяются к одной транзакции,
+    которая фиксируется один раз после обработки апдейта или откатывается при ошибке.
+    """
 
     async def __call__(
         self,
@@ -17,5 +23,14 @@ class DatabaseMiddleware(BaseMiddleware):
         data: dict[str, Any],
     ) -> Any:
         async with async_session_factory() as session:
+            session.info[UNIT_OF_WORK] = True
             data["session"] = session
-            return await handler(event, data)
+            try:
+                result = await handler(event, data)
+            except Exception:
+                await session.rollback()
+                raise
+
+            if has_uncommitted_changes(session):
+                await session.commit()
+            return result
@@ -1,25 +1,19 @@
-import logging
 from collections.abc import Awaitable, Callable
 from typing import Any
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, User
 from fluentogram import TranslatorHub
-from redis.asyncio import Redis
-from sqlalchemy import select
 
 from app.core.i18n import ROOT_LOCALE, available_locales
-from app.db.models.chat import Chat
-
-logger = logging.getLogger(__name__)
+from app.schemas.chat import ChatContext
 
 
 class I18nMiddleware(BaseMiddleware):
     """Middleware для интернационализации."""
 
-    def __init__(self, translator_hub: TranslatorHub, valkey: Redis) -> None:
+    def __init__(self, translator_hub: TranslatorHub) -> None:
         self.translator_hub = translator_hub
-        self.valkey = valkey
 
     async def __call__(
         self,
@@ -27,32 +21,11 @@ class I18nMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        chat = getattr(event, "chat", None)
-        if not chat:
-            message = getattr(event, "message", None)
-            if message:
-                chat = getattr(message, "chat", None)
-
-        if not chat:
-            logger.debug("Chat not found in event %s", type(event).__name__)
-
         user: User | None = getattr(event, "from_user", None)
 
-        lang_code = None
-
-        if chat:
-            chat_id = chat.id
-            lang_code = await self.valkey.get(f"lang:{chat_id}")
-
-            if not lang_code:
-                session = data.get("session")
-                if session:
-                    stmt = select(Chat.language_code).where(Chat.id == chat_id)
-                    result = await session.execute(stmt)
-                    lang_code = result.scalar_one_or_none()
-
-                    if lang_code:
-                        await self.valkey.set(f"lang:{chat_id}", lang_code, ex=3600)
+        # Язык чата берётся из снимка настроек, который уже получил ChatMiddleware
+        db_chat: ChatContext | None = data.get("db_chat")
+        lang_code = db_chat.language_code if db_chat else None
 
         if not lang_code:
             lang_code = user.language_code if user and user.language_code in available_locales else ROOT_LOCALE
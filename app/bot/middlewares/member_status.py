@@ -0,0 +1,33 @@
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import ChatMemberUpdated, TelegramObject
+
+from app.services.member_status_service import member_status
+
+logger = logging.getLogger(__name__)
+
+
+class MemberStatusMiddleware(BaseMiddleware):
+    """Middleware для обновления кэша статусов участников по апдейтам chat_member/my_chat_member."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, ChatMemberUpdated) and event.chat.type in ("group", "supergroup"):
+            try:
+                await member_status.track(
+                    data["bot"],
+                    event.chat.id,
+                    event.new_chat_member.user.id,
+                    event.new_chat_member.status,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to update member status cache: {e}")
+
+        return await handler(event, data)
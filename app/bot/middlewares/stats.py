@@ -1,13 +1,10 @@
 from collections.abc import Awaitable, Callable
-from datetime import date
 from typing import Any
 
 from aiogram import BaseMiddleware
 from aiogram.types import Message, TelegramObject
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.daily_stat import DailyStat
+from app.services.stats_service import StatsService
 
 
 class StatsMiddleware(BaseMiddleware):
@@ -20,18 +17,6 @@ class StatsMiddleware(BaseMiddleware):
         data: dict[str, Any],
     ) -> Any:
         if isinstance(event, Message):
-            session: AsyncSession = data["session"]
-            today = date.today()
-
-            stmt = (
-                insert(DailyStat)
-                .values(date=today, messages_count=1)
-                .on_conflict_do_update(
-                    index_elements=[DailyStat.date],
-                    set_={DailyStat.messages_count: DailyStat.messages_count + 1},
-                )
-            )
-            await session.execute(stmt)
-            await session.commit()
+            await StatsService.record_message()
 
         return await handler(event, data)
@@ -7,6 +7,8 @@ from fluentogram import TranslatorRunner
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.trust_history import ChatTrustHistory
+from app.schemas.chat import ChatContext
+from app.services.chat_service import update_chat_settings
 
 
 class TrustMiddleware(BaseMiddleware):
@@ -43,9 +45,6 @@ class TrustMiddleware(BaseMiddleware):
                 return await handler(event, data)
 
             if not db_chat.is_trusted and db_user.is_trusted:
-                db_chat.is_trusted = True
-                session.add(db_chat)
-
                 history = ChatTrustHistory(
                     chat_id=chat.id,
                     user_id=user.id,
@@ -53,7 +52,8 @@ class TrustMiddleware(BaseMiddleware):
                 )
                 session.add(history)
 
-                await session.commit()
+                db_chat = await update_chat_settings(session, chat.id, is_trusted=True)
+                data["db_chat"] = ChatContext.from_model(db_chat)
 
                 i18n: TranslatorRunner = data.get("i18n")
                 if i18n:
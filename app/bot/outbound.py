@@ -0,0 +1,145 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OnSent = Callable[[], Awaitable[None]]
+
+MAX_RETRIES = 3
+CLOSE_TIMEOUT = 5
+
+
+class TokenBucket:
+    """Ограничитель частоты: rate токенов в секунду, не больше capacity в запасе."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Дождаться и забрать токен."""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OutboundScheduler:
+    """
+    Планировщик исходящих сообщений.
+
+    У каждого чата своя FIFO-очередь и своя задача-отправитель, поэтому обработчик
+    апдейта не ждёт отправки. Частота ограничивается лимитами Telegram на чат
+    (группы и личные чаты отдельно) и общим лимитом бота. Лимиты считаются в пределах процесса:
+    чат всегда обрабатывается одним процессом, а общий лимит в партиционированном режиме
+    делится на BOT_PARTITIONS.
+    """
+
+    def __init__(self) -> None:
+        self._queues: dict[int, deque[tuple[TelegramMethod, OnSent | None]]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._chat_buckets: LRUCache[int, TokenBucket] = LRUCache(maxsize=10_000, ttl=300)
+        # В партиционированном режиме общий лимит бота делится между процессами партиций
+        global_rate = settings.OUTBOUND_GLOBAL_RATE / max(settings.BOT_PARTITIONS, 1)
+        self._global = TokenBucket(global_rate, max(global_rate, 1))
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Отрицательные ID — группы и каналы
+            rate = settings.OUTBOUND_GROUP_PER_MINUTE / 60 if chat_id < 0 else settings.OUTBOUND_PRIVATE_PER_SECOND
+            bucket = TokenBucket(rate, settings.OUTBOUND_CHAT_BURST)
+        self._chat_buckets.set(chat_id, bucket)
+        return bucket
+
+    def submit(self, bot: Bot, chat_id: int, method: TelegramMethod, on_sent: OnSent | None = None) -> bool:
+        """
+        Поставить сообщение в очередь чата.
+
+        Args:
+            bot: Экземпляр бота
+            chat_id: ID чата назначения
+            method: Подготовленный метод отправки
+            on_sent: Вызывается после успешной отправки
+
+        Returns:
+            False, если очередь чата переполнена и сообщение отброшено
+        """
+        queue = self._queues.setdefault(chat_id, deque())
+        if len(queue) >= settings.OUTBOUND_CHAT_QUEUE_SIZE:
+            logger.warning(f"Outbound queue for chat {chat_id} is full, dropping message")
+            return False
+
+        queue.append((method, on_sent))
+        if chat_id not in self._tasks:
+            self._tasks[chat_id] = asyncio.create_task(self._drain(bot, chat_id))
+        return True
+
+    async def _drain(self, bot: Bot, chat_id: int) -> None:
+        """Отправлять сообщения чата по очереди, соблюдая лимиты."""
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                await self._chat_bucket(chat_id).acquire()
+                await self._global.acquire()
+                method, on_sent = queue.popleft()
+                await self._send(bot, method, on_sent)
+        finally:
+            self._tasks.pop(chat_id, None)
+            if not queue:
+                self._queues.pop(chat_id, None)
+
+    @staticmethod
+    async def _send(bot: Bot, method: TelegramMethod, on_sent: OnSent | None) -> None:
+        for attempt in range(MAX_RETRIES):
+            try:
+                await bot(method)
+            except TelegramRetryAfter as e:
+                logger.warning(f"Flood control on {type(method).__name__}, retry after {e.retry_after}s")
+                if attempt + 1 < MAX_RETRIES:
+                    await asyncio.sleep(e.retry_after)
+                continue
+            except Exception:
+                logger.exception("Error sending outbound message")
+                return
+
+            if on_sent:
+                try:
+                    await on_sent()
+                except Exception:
+                    logger.exception("Error in outbound on_sent callback")
+            return
+
+    async def close(self) -> None:
+        """Дождаться отправки очередей (не дольше CLOSE_TIMEOUT) и остановить отправителей."""
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=CLOSE_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        for task in pending:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+outbound = OutboundScheduler()
@@ -0,0 +1,79 @@
+import logging
+from typing import Any
+
+from faststream import FastStream
+from faststream.rabbit import Channel
+
+from app.core.logging import setup_logging
+
+setup_logging()
+
+from app.bot.dispatcher import dp
+from app.bot.ingestion import process_update, update_queue
+from app.bot.instance import bot
+from app.bot.outbound import outbound
+from app.core.broker import broker, update_partition_queue, updates_exchange
+from app.core.config import settings
+from app.core.database import engine
+from app.core.invalidation import invalidation_bus
+from app.core.storage import storage
+from app.core.valkey import valkey
+from app.services.regex_guard import regex_sandbox
+
+logger = logging.getLogger(__name__)
+
+app = FastStream(broker)
+
+
+@app.on_startup
+async def startup() -> None:
+    """Подготовка зависимостей обработчиков."""
+    logger.info(f"Starting update partition {settings.BOT_PARTITION} of {settings.BOT_PARTITIONS}")
+    await valkey.ping()
+    await storage.ensure_bucket()
+
+
+@app.after_startup
+async def start_processing() -> None:
+    """Запуск обработки апдейтов."""
+    invalidation_bus.start()
+    update_queue.start(dp, bot)
+
+
+@app.on_shutdown
+async def shutdown() -> None:
+    """Дообработка очереди и освобождение ресурсов."""
+    logger.info(f"Stopping update partition {settings.BOT_PARTITION}")
+    await update_queue.close()
+    await outbound.close()
+    await invalidation_bus.stop()
+    regex_sandbox.shutdown()
+
+
+@app.after_shutdown
+async def close_connections() -> None:
+    """Закрытие соединений."""
+    await valkey.aclose()
+    await engine.dispose()
+
+
+@broker.subscriber(
+    update_partition_queue(settings.BOT_PARTITION),
+    exchange=updates_exchange,
+    # Число неподтверждённых апдейтов ограничивает RabbitMQ; без фоновых обработчиков порядок требует одного
+    channel=Channel(prefetch_count=settings.BOT_PARTITION_PREFETCH if update_queue.enabled else 1),
+)
+async def consume_update(update_data: dict[str, Any]) -> None:
+    """
+    Обработать апдейт из партиции.
+    Сообщение подтверждается только после обработки, поэтому при падении процесса апдейт будет доставлен снова.
+
+    aiormq запускает отдельную задачу на каждое сообщение, и при prefetch больше одного обработчики
+    выполняются параллельно. Задачи стартуют в порядке доставки, а FastStream доходит до обработчика
+    без сетевых ожиданий, поэтому апдейт ставится в очередь чата синхронно, до первого await:
+    так порядок постановки совпадает с порядком в партиции, а дальше его сохраняет очередь чата.
+    """
+    if update_queue.enabled:
+        await update_queue.submit(update_data)
+    else:
+        await process_update(dp, bot, update_data)
@@ -0,0 +1,52 @@
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import Update
+
+from app.core.valkey_pipeline import Command, cached_call, discard_prefetched
+from app.services.gban_service import GbanService, gban_index
+
+
+class PrefetchingRedisStorage(RedisStorage):
+    """FSM-хранилище, читающее состояние из предзагрузки апдейта."""
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return await cached_call("get", self.key_builder.build(key, "state"))
+
+    async def set_state(self, key: StorageKey, state: str | State | None = None) -> None:
+        discard_prefetched("get", self.key_builder.build(key, "state"))
+        await super().set_state(key, state)
+
+
+def collect_update_keys(dispatcher: Dispatcher, bot: Bot, update: Update) -> list[Command]:
+    """
+    Команды чтения Valkey, которые middleware выполнят при обработке апдейта:
+    глобальный бан отправителя и FSM-состояние.
+    """
+    event_context = UserContextMiddleware.resolve_event_context(update)
+    commands: list[Command] = []
+
+    # После загрузки in-process индекса гбан проверяется без Valkey
+    if (
+        not gban_index.ready
+        and event_context.user
+        and update.message
+        and update.message.chat.type in ("group", "supergroup")
+    ):
+        commands.append(("sismember", GbanService.REDIS_KEY, str(event_context.user_id)))
+
+    storage = dispatcher.fsm.storage
+    if isinstance(storage, PrefetchingRedisStorage):
+        fsm_context = dispatcher.fsm.resolve_context(
+            bot=bot,
+            chat_id=event_context.chat_id,
+            user_id=event_context.user_id,
+            thread_id=event_context.thread_id,
+            business_connection_id=event_context.business_connection_id,
+        )
+        if fsm_context:
+            commands.append(("get", storage.key_builder.build(fsm_context.key, "state")))
+
+    return commands
@@ -0,0 +1,45 @@
+from typing import Any
+
+from app.services.banned_chat_registry import banned_chats
+
+# Уведомления Telegram о пересланных из канала сообщениях
+SERVICE_USER_ID = 777000
+# GroupAnonymousBot: от его имени пишут анонимные администраторы
+ANONYMOUS_ADMIN_ID = 1087968824
+
+
+def event_chat_id(event: dict[str, Any]) -> int | None:
+    chat = event.get("chat") or (event.get("message") or {}).get("chat")
+    return chat.get("id") if chat else None
+
+
+def should_drop_update(update_data: dict[str, Any]) -> bool:
+    """
+    Быстрая проверка сырого апдейта до разбора и любых обращений к БД или Valkey.
+    Отбрасывает апдейты от ботов и служебных аккаунтов, а также из забаненных чатов.
+    """
+    event_type = next((key for key in update_data if key != "update_id"), None)
+    event = update_data.get(event_type)
+    if not isinstance(event, dict):
+        return False
+
+    user = event.get("from") or event.get("user")
+    if user:
+        if user.get("id") == SERVICE_USER_ID:
+            return True
+        if user.get("is_bot") and user.get("id") != ANONYMOUS_ADMIN_ID:
+            return True
+
+    if event_type == "chat_member" and event.get("new_chat_member", {}).get("user", {}).get("is_bot"):
+        return True
+
+    if event_type == "message" and any(member.get("is_bot") for member in event.get("new_chat_members", ())):
+        return True
+
+    # my_chat_member пропускается: по нему BannedChatMiddleware выходит из забаненного чата
+    if event_type != "my_chat_member":
+        chat_id = event_chat_id(event)
+        if chat_id is not None and banned_chats.is_banned(chat_id):
+            return True
+
+    return False
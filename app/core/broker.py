@@ -1,6 +1,6 @@
 from enum import StrEnum
 
-from faststream.rabbit import RabbitBroker, RabbitExchange
+from faststream.rabbit import ExchangeType, RabbitBroker, RabbitExchange, RabbitQueue
 
 from app.core.config import settings
 
@@ -16,3 +16,20 @@ delayed_exchange = RabbitExchange(
     type=ExchangeTypeCustom.X_DELAYED_MESSAGE,
     arguments={"x-delayed-type": "direct"},
 )
+
+# Апдейты вебхука в партиционированном режиме: чат попадает в партицию по хэшу chat_id
+updates_exchange = RabbitExchange(name="updates_exchange", type=ExchangeType.X_CONSISTENT_HASH)
+
+
+def update_partition_queue(partition: int) -> RabbitQueue:
+    """
+    Очередь партиции апдейтов.
+    Одновременно её читает только один процесс, поэтому апдейты чата обрабатываются по порядку.
+    """
+    return RabbitQueue(
+        name=f"q.updates.{partition}",
+        durable=True,
+        arguments={"x-single-active-consumer": True},
+        # Для consistent-hash ключ привязки — вес партиции
+        routing_key="1",
+    )
@@ -0,0 +1,49 @@
+import time
+from collections import OrderedDict
+
+
+class LRUCache[K, V]:
+    """
+    Ограниченный по размеру in-process LRU-кэш.
+    При заданном ttl записи дополнительно устаревают по времени.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Получить значение и пометить его как недавно использованное."""
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            return None
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Сохранить значение, вытесняя самое старое при переполнении."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """Удалить значение из кэша."""
+        item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._data.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,3 +1,4 @@
+from typing import Literal
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from pydantic import Field, PostgresDsn, RedisDsn, SecretStr, computed_field, field_validator
@@ -32,6 +33,37 @@ class Settings(BaseSettings):
     URL_PREFIX: str = ""
     BOT_USERNAME: str | None = Field(None, validation_alias="VITE_BOT_USERNAME")
     GBAN_LIST_URL: str = "https://lols.bot/spam/banlist.json"
+    TRIGGER_MATCHER_CACHE_SIZE: int = 1024
+    TRIGGER_L1_TTL: int = 300
+    REGEX_MATCH_BUDGET_MS: int = 50
+    REGEX_SANDBOX_TIMEOUT_MS: int = 250
+    REGEX_SANDBOX_WORKERS: int = 2
+    STATS_FLUSH_INTERVAL: int = 30
+    STATS_COUNTER_SHARDS: int = 1
+    TEMPLATE_CACHE_SIZE: int = 512
+    CHAT_VARS_CACHE_SIZE: int = 1024
+    CHAT_VARS_L1_TTL: int = 300
+    OUTBOUND_GLOBAL_RATE: int = 30
+    OUTBOUND_GROUP_PER_MINUTE: int = 20
+    OUTBOUND_PRIVATE_PER_SECOND: int = 1
+    OUTBOUND_CHAT_BURST: int = 3
+    OUTBOUND_CHAT_QUEUE_SIZE: int = 50
+    MEMBER_STATUS_CACHE_SIZE: int = 4096
+    MEMBER_STATUS_TTL: int = 600
+    UPSERT_CACHE_SIZE: int = 50_000
+    UPSERT_FINGERPRINT_TTL: int = 3600
+    USER_CHAT_TOUCH_INTERVAL: int = 300
+    CHAT_CONTEXT_CACHE_SIZE: int = 4096
+    CHAT_CONTEXT_L1_TTL: int = 300
+    WEBHOOK_WORKERS: int = 8
+    WEBHOOK_QUEUE_SIZE: int = 1000
+    WEBHOOK_CHAT_QUEUE_SIZE: int = 100
+    WEBHOOK_OVERFLOW_POLICY: Literal["reject", "drop_oldest", "drop_new"] = "reject"
+    UPDATE_DEDUP_SIZE: int = 10_000
+    UPDATE_DEDUP_TTL: int = 3600
+    BOT_PARTITIONS: int = 0
+    BOT_PARTITION: int = 0
+    BOT_PARTITION_PREFETCH: int = 100
 
     @computed_field
     def BOT_ADMINS(self) -> list[int]:
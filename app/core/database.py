@@ -1,6 +1,8 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, SessionTransaction
 
 from app.core.config import settings
 
@@ -21,6 +23,75 @@ async_session_factory = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Ключи session.info
+UNIT_OF_WORK = "unit_of_work"
+_HAS_CHANGES = "has_changes"
+_AFTER_COMMIT = "after_commit"
+_SAVEPOINTS = "savepoints"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_changes(session: Session, flush_context: object) -> None:
+    session.info[_HAS_CHANGES] = True
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session: Session, transaction: SessionTransaction) -> None:
+    # Запоминаем, сколько callback'ов было до SAVEPOINT, чтобы при его откате отбросить добавленные внутри
+    if transaction.nested:
+        session.info.setdefault(_SAVEPOINTS, {})[transaction] = len(session.info.get(_AFTER_COMMIT, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    # Событие приходит и при RELEASE SAVEPOINT: внешняя транзакция ещё не зафиксирована
+    if session.in_nested_transaction():
+        session.info.get(_SAVEPOINTS, {}).pop(session.get_nested_transaction(), None)
+        return
+
+    session.info.pop(_HAS_CHANGES, None)
+    session.info.pop(_SAVEPOINTS, None)
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        # Откат SAVEPOINT: изменения внешней транзакции остаются, отбрасываем только callback'и SAVEPOINT
+        mark = session.info.get(_SAVEPOINTS, {}).pop(session.get_nested_transaction(), None)
+        if mark is not None:
+            del session.info.get(_AFTER_COMMIT, [])[mark:]
+        return
+
+    session.info.pop(_HAS_CHANGES, None)
+    session.info.pop(_SAVEPOINTS, None)
+    session.info.pop(_AFTER_COMMIT, None)
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Выполнить callback после фиксации текущей транзакции; при откате он отбрасывается."""
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+def has_uncommitted_changes(session: AsyncSession) -> bool:
+    """Проверить, есть ли в текущей транзакции незафиксированные изменения (в том числе ещё не отправленные в БД)."""
+    return bool(session.info.get(_HAS_CHANGES) or session.new or session.dirty or session.deleted)
+
+
+async def commit_or_join(session: AsyncSession) -> None:
+    """
+    Зафиксировать изменения.
+    Внутри единицы работы апдейта изменения только отправляются в БД
+    и фиксируются вместе с остальными в конце обработки.
+    """
+    if session.info.get(UNIT_OF_WORK):
+        await session.flush()
+        # Core-запросы (insert/update) не вызывают flush, поэтому отмечаем изменения явно
+        session.info[_HAS_CHANGES] = True
+    else:
+        await session.commit()
+
 
 async def get_db() -> AsyncGenerator[AsyncSession]:
     """
@@ -0,0 +1,100 @@
+import asyncio
+import contextlib
+import json
+import logging
+from collections.abc import Callable
+
+from app.core.valkey import valkey
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+InvalidationHandler = Callable[[str, int], None]
+
+
+class InvalidationBus:
+    """Рассылка инвалидаций in-process кэшей между репликами через Valkey pub/sub."""
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, InvalidationHandler] = {}
+        self._reset_handlers: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def register(
+        self,
+        scope: str,
+        handler: InvalidationHandler,
+        reset: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Зарегистрировать обработчик инвалидации для области кэша.
+
+        Args:
+            scope: Имя области (например, "triggers")
+            handler: Вызывается с ключом и версией при получении инвалидации
+            reset: Вызывается при (пере)подключении к каналу, когда часть сообщений могла быть потеряна
+        """
+        self._handlers[scope] = handler
+        if reset:
+            self._reset_handlers.append(reset)
+
+    def _dispatch(self, scope: str, key: str, version: int) -> None:
+        handler = self._handlers.get(scope)
+        if handler:
+            handler(key, version)
+
+    async def publish(self, scope: str, key: str | int, version: int = 0) -> None:
+        """Сбросить запись локально и разослать инвалидацию всем репликам."""
+        self._dispatch(scope, str(key), version)
+        try:
+            await valkey.publish(
+                INVALIDATION_CHANNEL,
+                json.dumps({"scope": scope, "key": str(key), "version": version}),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish cache invalidation for {scope}:{key}: {e}")
+
+    async def listen(self) -> None:
+        """Слушать канал инвалидаций и применять их к локальным кэшам."""
+        while True:
+            pubsub = valkey.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Пока подписки не было, сообщения могли потеряться
+                for reset in self._reset_handlers:
+                    reset()
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        data = json.loads(message["data"])
+                        self._dispatch(data["scope"], data["key"], int(data.get("version", 0)))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"Malformed cache invalidation message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def start(self) -> None:
+        """Запустить фоновое прослушивание инвалидаций."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        """Остановить фоновое прослушивание инвалидаций."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+invalidation_bus = InvalidationBus()
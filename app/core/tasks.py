@@ -1,6 +1,8 @@
 import logging
 
+from app.core.database import async_session_factory
 from app.services.gban_service import GbanService
+from app.services.stats_service import StatsService
 
 logger = logging.getLogger(__name__)
 
@@ -12,3 +14,12 @@ async def update_gban_task() -> None:
         await GbanService.update_banlist()
     except Exception as e:
         logger.error(f"Error in update_gban_task: {e}")
+
+
+async def flush_stats_task() -> None:
+    """Задача для выгрузки накопленных счётчиков статистики в БД."""
+    try:
+        async with async_session_factory() as session:
+            await StatsService.flush(session)
+    except Exception as e:
+        logger.error(f"Error in flush_stats_task: {e}")
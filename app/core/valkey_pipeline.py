@@ -0,0 +1,52 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from app.core.valkey import valkey
+
+logger = logging.getLogger(__name__)
+
+Command = tuple[str, ...]
+
+_prefetched: ContextVar[dict[Command, Any] | None] = ContextVar("prefetched", default=None)
+
+
+async def cached_call(*command: str) -> Any:
+    """
+    Выполнить команду Valkey (например, ("get", key)).
+    Если результат был предзагружен для текущего апдейта, запроса к Valkey не будет.
+    """
+    prefetched = _prefetched.get()
+    if prefetched is not None and command in prefetched:
+        return prefetched[command]
+    return await getattr(valkey, command[0])(*command[1:])
+
+
+def discard_prefetched(*command: str) -> None:
+    """Забыть предзагруженный результат после изменения ключа."""
+    prefetched = _prefetched.get()
+    if prefetched is not None:
+        prefetched.pop(command, None)
+
+
+@asynccontextmanager
+async def prefetch(commands: list[Command]) -> AsyncIterator[None]:
+    """Выполнить команды чтения одним пайплайном и отдавать их результаты через cached_call."""
+    prefetched: dict[Command, Any] = {}
+    if commands:
+        try:
+            async with valkey.pipeline(transaction=False) as pipe:
+                for command in commands:
+                    getattr(pipe, command[0])(*command[1:])
+                results = await pipe.execute()
+            prefetched = dict(zip(commands, results, strict=True))
+        except Exception as e:
+            logger.warning(f"Failed to prefetch Valkey keys: {e}")
+
+    token = _prefetched.set(prefetched)
+    try:
+        yield
+    finally:
+        _prefetched.reset(token)
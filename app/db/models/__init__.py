@@ -4,6 +4,7 @@ from .chat import BannedChat, Chat
 from .chat_variable import ChatVariable
 from .daily_stat import DailyStat
 from .moderation_history import ModerationHistory, ModerationStep
+from .stats_flush_batch import StatsFlushBatch
 from .trigger import Trigger
 from .trust_history import ChatTrustHistory
 from .user import User
@@ -20,6 +21,7 @@ __all__ = [
     "DailyStat",
     "ModerationHistory",
     "ModerationStep",
+    "StatsFlushBatch",
     "Trigger",
     "User",
     "UserChat",
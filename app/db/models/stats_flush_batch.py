@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.models.base import Base
+
+
+class StatsFlushBatch(Base):
+    """Пачка счётчиков статистики, уже выгруженная из Valkey (защита от повторного учёта)."""
+
+    __tablename__ = "stats_flush_batches"
+
+    batch_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    flushed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -3,8 +3,7 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from typing import Any
 
-from aiogram.types import Update
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
@@ -13,13 +12,20 @@ from app.core.logging import setup_logging
 
 setup_logging()
 
+from app.bot.dedup import update_dedup
 from app.bot.dispatcher import dp
+from app.bot.ingestion import declare_partitions, process_update, publish_update, update_queue
 from app.bot.instance import bot
+from app.bot.outbound import outbound
+from app.bot.prefilter import should_drop_update
 from app.core.broker import broker
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import async_session_factory, engine
+from app.core.invalidation import invalidation_bus
 from app.core.storage import storage
 from app.core.valkey import valkey
+from app.services.banned_chat_registry import banned_chats
+from app.services.regex_guard import regex_sandbox
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +38,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     await valkey.ping()
     await storage.ensure_bucket()
     await broker.start()
+    invalidation_bus.start()
+    # Забаненные чаты отсекаются ещё до очереди; список обновляется через шину инвалидаций
+    async with async_session_factory() as session:
+        await banned_chats.load(session)
+    if settings.BOT_PARTITIONS:
+        # Апдейты обрабатывают процессы app.bot.partition
+        await declare_partitions()
+    else:
+        update_queue.start(dp, bot)
 
     logger.info(f"Setting webhook to {settings.WEBHOOK_URL}")
     try:
@@ -49,6 +64,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
 
     logger.info("Shutting down application")
     await bot.delete_webhook()
+    await update_queue.close()
+    await outbound.close()
+    await invalidation_bus.stop()
+    regex_sandbox.shutdown()
     await broker.stop()
     await valkey.aclose()
     await engine.dispose()
@@ -71,15 +90,48 @@ app.mount(f"{settings.URL_PREFIX}/webapp", StaticFiles(directory="frontend/dist"
 
 
 @app.post(f"{settings.URL_PREFIX}{settings.WEBHOOK_PATH}")
-async def bot_webhook(request: Request) -> dict[str, Any]:
-    """Обработчик вебхука от Telegram."""
+async def bot_webhook(request: Request, response: Response) -> dict[str, Any]:
+    """
+    Обработчик вебхука от Telegram.
+    Апдейт ставится в очередь, и Telegram получает ответ, не дожидаясь обработки.
+    """
     secret_token = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
     if secret_token != settings.SECRET_TOKEN:
         return {"status": "unauthorized"}
 
     update_data = await request.json()
-    update = Update.model_validate(update_data)
-    await dp.feed_webhook_update(bot, update)
+    if not banned_chats.loaded:
+        # Подписка на шину переподключалась, и изменения могли быть пропущены
+        async with async_session_factory() as session:
+            await banned_chats.load(session)
+    if should_drop_update(update_data):
+        return {"status": "ok"}
+
+    update_id = update_data["update_id"]
+    if not await update_dedup.claim(update_id):
+        return {"status": "ok"}
+
+    if settings.BOT_PARTITIONS:
+        try:
+            await publish_update(update_data)
+        except Exception:
+            await update_dedup.release(update_id)
+            raise
+        return {"status": "ok"}
+
+    if not update_queue.enabled:
+        try:
+            await process_update(dp, bot, update_data)
+        except Exception:
+            await update_dedup.release(update_id)
+            raise
+        return {"status": "ok"}
+
+    if not update_queue.put(update_data):
+        # Telegram повторит доставку позже
+        await update_dedup.release(update_id)
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "overloaded"}
     return {"status": "ok"}
 
 
@@ -0,0 +1,52 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any
+
+from app.db.models.chat import Chat
+
+
+@dataclass(frozen=True, slots=True)
+class ChatContext:
+    """Неизменяемый снимок настроек чата для обработки апдейтов (без состояния ORM)."""
+
+    id: int
+    type: str | None
+    language_code: str
+    timezone: str
+    is_trusted: bool
+    module_triggers: bool
+    module_moderation: bool
+    gban_enabled: bool
+    admins_only_add: bool
+    warn_limit: int
+    warn_punishment: str
+    warn_duration: int
+    captcha_enabled: bool
+    captcha_type: str
+    captcha_timeout: int
+    captcha_max_attempts: int
+    captcha_ban_duration: int
+    welcome_enabled: bool
+    welcome_message: Mapping[str, Any] | None
+    welcome_delete_timeout: int
+
+    @classmethod
+    def from_model(cls, chat: Chat) -> "ChatContext":
+        """Собрать снимок из строки чата."""
+        return cls.from_dict({f.name: getattr(chat, f.name) for f in fields(cls)})
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ChatContext":
+        """Собрать снимок из сериализованного кэша."""
+        values = {f.name: data[f.name] for f in fields(cls)}
+        if values["welcome_message"] is not None:
+            values["welcome_message"] = MappingProxyType(values["welcome_message"])
+        return cls(**values)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Сериализовать снимок для кэша."""
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        if self.welcome_message is not None:
+            data["welcome_message"] = dict(self.welcome_message)
+        return data
@@ -17,3 +17,23 @@ class StatsResponse(BaseModel):
     new_chats_last_30_days: list[DailyActivity]
     message_activity: list[DailyActivity]
     trigger_usage_activity: list[DailyActivity]
+
+
+class ThrottledChat(BaseModel):
+    chat_id: int | None
+    pending: int
+    busy_seconds: float
+    overflows: int
+
+
+class IngestionStats(BaseModel):
+    size: int
+    capacity: int
+    chats: int
+    workers: int
+    accepted: int
+    rejected: int
+    dropped: int
+    processed: int
+    failed: int
+    throttled_chats: list[ThrottledChat]
@@ -1,5 +1,10 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import datetime
+from types import MappingProxyType
+from typing import Any
 
+from aiogram.methods import TelegramMethod
 from app.db.models.trigger import AccessLevel, MatchType, ModerationStatus
 from pydantic import BaseModel, ConfigDict
 
@@ -30,3 +35,43 @@ class TriggerQueueStatus(BaseModel):
 class TriggerListResponse(BaseModel):
     items: list[TriggerRead]
     total: int
+
+
+class SlowRegexRead(BaseModel):
+    trigger_id: int
+    chat_id: int
+    key_phrase: str
+    elapsed_ms: float
+    reason: str
+    reported_at: datetime
+
+
+class SlowRegexListResponse(BaseModel):
+    items: list[SlowRegexRead]
+
+
+@dataclass(frozen=True, slots=True)
+class TriggerSnapshot:
+    """Неизменяемый снимок триггера для сопоставления и отправки (без состояния ORM)."""
+
+    id: int
+    key_phrase: str
+    match_type: MatchType
+    is_case_sensitive: bool
+    access_level: AccessLevel
+    is_template: bool
+    content: Mapping[str, Any]
+    send_method: TelegramMethod | None = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TriggerSnapshot":
+        """Собрать снимок из сериализованного кэша триггеров."""
+        return cls(
+            id=data["id"],
+            key_phrase=data["key_phrase"],
+            match_type=MatchType(data["match_type"]),
+            is_case_sensitive=data["is_case_sensitive"],
+            access_level=AccessLevel(data["access_level"]),
+            is_template=data.get("is_template", False),
+            content=MappingProxyType(data["content"]),
+        )
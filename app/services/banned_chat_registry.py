@@ -0,0 +1,91 @@
+import asyncio
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.invalidation import invalidation_bus
+from app.db.models.chat import BannedChat
+
+logger = logging.getLogger(__name__)
+
+# Версия в сообщении инвалидации передаёт состояние: 1 — чат забанен, 0 — разбанен
+_BANNED = 1
+_UNBANNED = 0
+
+
+class BannedChatRegistry:
+    """
+    In-process множество забаненных чатов.
+
+    Загружается из banned_chats один раз и обновляется при бане и разбане,
+    в том числе на других репликах через шину инвалидаций. Проверка чата
+    не обращается ни к Postgres, ни к Valkey.
+    """
+
+    def __init__(self) -> None:
+        self._ids: set[int] = set()
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        # События, пришедшие во время загрузки: SELECT мог их не увидеть
+        self._pending: list[tuple[int, int]] | None = None
+        self._resets = 0
+        invalidation_bus.register("banned_chats", self._on_invalidated, reset=self._reset)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @staticmethod
+    def _apply(ids: set[int], chat_id: int, version: int) -> None:
+        if version == _BANNED:
+            ids.add(chat_id)
+        else:
+            ids.discard(chat_id)
+
+    def _on_invalidated(self, key: str, version: int) -> None:
+        self._apply(self._ids, int(key), version)
+        if self._pending is not None:
+            self._pending.append((int(key), version))
+
+    def _reset(self) -> None:
+        # Пока не было подписки, изменения могли быть пропущены: перечитываем при следующей проверке
+        self._loaded = False
+        self._resets += 1
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Загрузить список забаненных чатов из БД.
+        Бан и разбан, пришедшие во время запроса, применяются поверх загруженного списка.
+        """
+        async with self._lock:
+            if self._loaded:
+                return
+            resets = self._resets
+            self._pending = []
+            try:
+                result = await session.execute(select(BannedChat.chat_id))
+                ids = set(result.scalars().all())
+                for chat_id, version in self._pending:
+                    self._apply(ids, chat_id, version)
+            finally:
+                self._pending = None
+            self._ids = ids
+            # Если подписка переподключилась во время загрузки, список нужно перечитать
+            self._loaded = self._resets == resets
+        logger.info(f"Loaded {len(ids)} banned chats")
+
+    def is_banned(self, chat_id: int) -> bool:
+        """Проверить, забанен ли чат."""
+        return chat_id in self._ids
+
+    async def add(self, chat_id: int) -> None:
+        """Отметить чат забаненным на всех репликах."""
+        await invalidation_bus.publish("banned_chats", chat_id, _BANNED)
+
+    async def remove(self, chat_id: int) -> None:
+        """Снять отметку о бане чата на всех репликах."""
+        await invalidation_bus.publish("banned_chats", chat_id, _UNBANNED)
+
+
+banned_chats = BannedChatRegistry()
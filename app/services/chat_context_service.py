@@ -0,0 +1,104 @@
+import json
+import logging
+from typing import NamedTuple
+
+from redis.exceptions import WatchError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.valkey import valkey
+from app.db.models.chat import Chat
+from app.schemas.chat import ChatContext
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 3600
+
+
+class _CachedContext(NamedTuple):
+    version: int
+    context: ChatContext | None
+
+
+_l1_contexts: LRUCache[int, _CachedContext] = LRUCache(
+    maxsize=settings.CHAT_CONTEXT_CACHE_SIZE,
+    ttl=settings.CHAT_CONTEXT_L1_TTL,
+)
+
+
+def _on_context_invalidated(key: str, version: int) -> None:
+    """Оставить в L1 метку версии, чтобы запоздавшая загрузка не вернула устаревший снимок."""
+    chat_id = int(key)
+    cached = _l1_contexts.get(chat_id)
+    if cached and cached.version >= version:
+        return
+    _l1_contexts.set(chat_id, _CachedContext(version=version, context=None))
+
+
+invalidation_bus.register("chat_context", _on_context_invalidated, reset=_l1_contexts.clear)
+
+
+async def invalidate_chat_context(chat_id: int) -> None:
+    """Сбросить снимок настроек чата в Valkey и в памяти всех реплик."""
+    async with valkey.pipeline(transaction=True) as pipe:
+        pipe.delete(f"chat_ctx:{chat_id}")
+        pipe.incr(f"chat_ctx:version:{chat_id}")
+        _, version = await pipe.execute()
+    await invalidation_bus.publish("chat_context", chat_id, version)
+
+
+async def _store_chat_context(chat_id: int, context: ChatContext, version: int) -> None:
+    """Записать снимок настроек в Valkey, если с момента чтения версии кэш не сбрасывался."""
+    version_key = f"chat_ctx:version:{chat_id}"
+    async with valkey.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(version_key)
+            if int(await pipe.get(version_key) or 0) != version:
+                return
+            pipe.multi()
+            pipe.set(f"chat_ctx:{chat_id}", json.dumps(context.to_dict()), ex=CACHE_TTL)
+            await pipe.execute()
+        except WatchError:
+            # Настройки изменились во время загрузки: прочитанные данные могли устареть
+            pass
+
+
+async def _load_chat_context(session: AsyncSession, chat_id: int) -> tuple[ChatContext | None, int]:
+    """Получить снимок настроек чата и его версию из Valkey или из БД."""
+    cache_key = f"chat_ctx:{chat_id}"
+    cached_data, version = await valkey.mget(cache_key, f"chat_ctx:version:{chat_id}")
+    version = int(version or 0)
+    if cached_data:
+        try:
+            return ChatContext.from_dict(json.loads(cached_data)), version
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Stale chat context cache for {chat_id}: {e!r}")
+
+    chat = await session.get(Chat, chat_id)
+    if chat is None:
+        return None, version
+
+    context = ChatContext.from_model(chat)
+    await _store_chat_context(chat_id, context, version)
+    return context, version
+
+
+async def get_chat_context(session: AsyncSession, chat_id: int) -> ChatContext | None:
+    """
+    Получить снимок настроек чата.
+    Горячие чаты обслуживаются из in-process L1 без обращения к Valkey и БД.
+    """
+    cached = _l1_contexts.get(chat_id)
+    if cached and cached.context is not None:
+        return cached.context
+
+    context, version = await _load_chat_context(session, chat_id)
+    if context is None:
+        return None
+
+    cached = _l1_contexts.get(chat_id)
+    if not cached or cached.version <= version:
+        _l1_contexts.set(chat_id, _CachedContext(version=version, context=context))
+    return context
@@ -1,11 +1,18 @@
+from functools import partial
+
 from sqlalchemy import String, cast, func, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.core.database import after_commit, commit_or_join
 from app.db.models.chat import BannedChat, Chat
 from app.db.models.trigger import Trigger
 from app.db.models.user_chat import UserChat
+from app.schemas.chat import ChatContext
+from app.services.banned_chat_registry import banned_chats
+from app.services.chat_context_service import get_chat_context, invalidate_chat_context
+from app.services.upsert_cache import upsert_coalescer
 
 
 async def get_chats(
@@ -86,6 +93,7 @@ async def ban_chat(session: AsyncSession, chat_id: int, reason: str) -> BannedCh
         session.add(banned_chat)
         await session.commit()
         await session.refresh(banned_chat)
+    await banned_chats.add(chat_id)
     return banned_chat
 
 
@@ -95,6 +103,20 @@ async def unban_chat(session: AsyncSession, chat_id: int) -> None:
     if banned_chat:
         await session.delete(banned_chat)
         await session.commit()
+    await banned_chats.remove(chat_id)
+
+
+def _chat_fingerprint(
+    *,
+    title: str | None,
+    username: str | None,
+    type: str | None,
+    description: str | None,
+    invite_link: str | None,
+    photo_id: str | None,
+) -> tuple:
+    """Отпечаток профиля чата для пропуска повторных upsert."""
+    return (title, username, type, description, invite_link, photo_id)
 
 
 async def get_or_create_chat(
@@ -108,7 +130,23 @@ async def get_or_create_chat(
     photo_id: str | None = None,
     is_active: bool | None = None,
 ) -> Chat:
-    """Получить чат по ID или создать, если он не существует. Обновляет данные."""
+    """
+    Получить чат по ID или создать, если он не существует. Обновляет данные.
+    Если данные не изменились с последней записи, чат только читается из БД.
+    """
+    fingerprint = _chat_fingerprint(
+        title=title,
+        username=username,
+        type=type,
+        description=description,
+        invite_link=invite_link,
+        photo_id=photo_id,
+    )
+    if is_active is None and upsert_coalescer.is_unchanged("chat", chat_id, fingerprint):
+        chat = await session.get(Chat, chat_id)
+        if chat is not None:
+            return chat
+
     values = {
         "id": chat_id,
         "title": title,
@@ -143,8 +181,69 @@ async def get_or_create_chat(
         .returning(Chat)
     )
     result = await session.execute(stmt)
-    await session.commit()
-    return result.scalar_one()
+    chat = result.scalar_one()
+    after_commit(session, partial(upsert_coalescer.remember, "chat", chat_id, fingerprint))
+    await commit_or_join(session)
+    return chat
+
+
+async def sync_chat(
+    session: AsyncSession,
+    chat_id: int,
+    *,
+    title: str | None = None,
+    username: str | None = None,
+    type: str | None = None,
+    description: str | None = None,
+    invite_link: str | None = None,
+    photo_id: str | None = None,
+) -> ChatContext:
+    """
+    Получить снимок настроек чата для обработки апдейта.
+    Если профиль чата изменился или чат ещё не известен, он записывается в БД.
+    """
+    fingerprint = _chat_fingerprint(
+        title=title,
+        username=username,
+        type=type,
+        description=description,
+        invite_link=invite_link,
+        photo_id=photo_id,
+    )
+    if upsert_coalescer.is_unchanged("chat", chat_id, fingerprint):
+        context = await get_chat_context(session, chat_id)
+        if context is not None:
+            return context
+
+    chat = await get_or_create_chat(
+        session=session,
+        chat_id=chat_id,
+        title=title,
+        username=username,
+        type=type,
+        description=description,
+        invite_link=invite_link,
+        photo_id=photo_id,
+    )
+    return ChatContext.from_model(chat)
+
+
+async def touch_user_chat(session: AsyncSession, user_id: int, chat_id: int) -> None:
+    """Отметить активность пользователя в чате: создать связь или обновить её updated_at."""
+    if not upsert_coalescer.should_touch(user_id, chat_id):
+        return
+
+    stmt = (
+        insert(UserChat)
+        .values(user_id=user_id, chat_id=chat_id, is_active=True, is_admin=False)
+        .on_conflict_do_update(
+            index_elements=[UserChat.user_id, UserChat.chat_id],
+            set_={"is_active": True, "updated_at": func.now()},
+        )
+    )
+    await session.execute(stmt)
+    after_commit(session, partial(upsert_coalescer.mark_touched, user_id, chat_id))
+    await commit_or_join(session)
 
 
 async def update_chat_settings(session: AsyncSession, chat_id: int, **kwargs) -> Chat:
@@ -159,6 +258,7 @@ async def update_chat_settings(session: AsyncSession, chat_id: int, **kwargs) ->
             setattr(chat, key, value)
     await session.commit()
     await session.refresh(chat)
+    await invalidate_chat_context(chat_id)
     return chat
 
 
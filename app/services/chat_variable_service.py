@@ -1,11 +1,51 @@
 import re
+from typing import NamedTuple
 
+from redis.exceptions import WatchError
 from sqlalchemy import delete, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.valkey import valkey
 from app.db.models.chat_variable import ChatVariable
 
+CACHE_TTL = 3600
+
+# Служебное поле хэша: отличает закэшированный пустой набор переменных от отсутствия кэша
+_LOADED_FIELD = "#"
+
+
+class _CachedVars(NamedTuple):
+    version: int
+    variables: dict[str, str] | None
+
+
+_l1_vars: LRUCache[int, _CachedVars] = LRUCache(maxsize=settings.CHAT_VARS_CACHE_SIZE, ttl=settings.CHAT_VARS_L1_TTL)
+
+
+def _on_vars_invalidated(key: str, version: int) -> None:
+    """Оставить в L1 метку версии, чтобы запоздавшая загрузка не вернула устаревшие переменные."""
+    chat_id = int(key)
+    cached = _l1_vars.get(chat_id)
+    if cached and cached.version >= version:
+        return
+    _l1_vars.set(chat_id, _CachedVars(version=version, variables=None))
+
+
+invalidation_bus.register("chat_vars", _on_vars_invalidated, reset=_l1_vars.clear)
+
+
+async def invalidate_vars_cache(chat_id: int) -> None:
+    """Сбросить кэш переменных чата в Valkey и в памяти всех реплик."""
+    async with valkey.pipeline(transaction=True) as pipe:
+        pipe.delete(f"chat_vars:{chat_id}")
+        pipe.incr(f"chat_vars:version:{chat_id}")
+        _, version = await pipe.execute()
+    await invalidation_bus.publish("chat_vars", chat_id, version)
+
 
 async def set_var(session: AsyncSession, chat_id: int, key: str, value: str) -> None:
     """Установить переменную чата."""
@@ -19,6 +59,7 @@ async def set_var(session: AsyncSession, chat_id: int, key: str, value: str) ->
     )
     await session.execute(stmt)
     await session.commit()
+    await invalidate_vars_cache(chat_id)
 
 
 async def del_var(session: AsyncSession, chat_id: int, key: str) -> bool:
@@ -26,15 +67,57 @@ async def del_var(session: AsyncSession, chat_id: int, key: str) -> bool:
     stmt = delete(ChatVariable).where(ChatVariable.chat_id == chat_id, ChatVariable.key == key)
     result = await session.execute(stmt)
     await session.commit()
+    await invalidate_vars_cache(chat_id)
     return result.rowcount > 0
 
 
-async def get_vars(session: AsyncSession, chat_id: int) -> dict[str, str]:
-    """Получить все переменные чата."""
+async def _store_vars(chat_id: int, variables: dict[str, str], version: int) -> None:
+    """Записать переменные в Valkey, если с момента чтения версии кэш не сбрасывался."""
+    cache_key = f"chat_vars:{chat_id}"
+    version_key = f"chat_vars:version:{chat_id}"
+    async with valkey.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(version_key)
+            if int(await pipe.get(version_key) or 0) != version:
+                return
+            pipe.multi()
+            pipe.delete(cache_key)
+            pipe.hset(cache_key, mapping={_LOADED_FIELD: "", **variables})
+            pipe.expire(cache_key, CACHE_TTL)
+            await pipe.execute()
+        except WatchError:
+            # Переменные изменились во время загрузки: прочитанные данные могли устареть
+            pass
+
+
+async def _load_vars(session: AsyncSession, chat_id: int) -> tuple[dict[str, str], int]:
+    """Получить переменные чата и версию их кэша из Valkey или из БД."""
+    async with valkey.pipeline(transaction=False) as pipe:
+        pipe.hgetall(f"chat_vars:{chat_id}")
+        pipe.get(f"chat_vars:version:{chat_id}")
+        cached, version = await pipe.execute()
+    version = int(version or 0)
+    if cached.pop(_LOADED_FIELD, None) is not None:
+        return cached, version
+
     stmt = select(ChatVariable).where(ChatVariable.chat_id == chat_id)
     result = await session.execute(stmt)
-    variables = result.scalars().all()
-    return {var.key: var.value for var in variables}
+    variables = {var.key: var.value for var in result.scalars()}
+    await _store_vars(chat_id, variables, version)
+    return variables, version
+
+
+async def get_vars(session: AsyncSession, chat_id: int) -> dict[str, str]:
+    """Получить все переменные чата (с кэшированием)."""
+    cached = _l1_vars.get(chat_id)
+    if cached and cached.variables is not None:
+        return dict(cached.variables)
+
+    variables, version = await _load_vars(session, chat_id)
+    cached = _l1_vars.get(chat_id)
+    if not cached or cached.version <= version:
+        _l1_vars.set(chat_id, _CachedVars(version=version, variables=variables))
+    return dict(variables)
 
 
 def validate_key(key: str) -> bool:
@@ -1,63 +1,241 @@
+import asyncio
 import logging
+from array import array
+from bisect import bisect_left
+from collections.abc import AsyncIterator
 
 import aiohttp
 
 from app.core.config import settings
+from app.core.invalidation import invalidation_bus
 from app.core.valkey import valkey
+from app.core.valkey_pipeline import cached_call
 
 logger = logging.getLogger(__name__)
 
+REDIS_KEY = "gban:users"
+VERSION_KEY = "gban:version"
+HTTP_CACHE_KEY = "gban:http"
+
+DIFF_CHUNK_SIZE = 1000
+
+
+class GbanIndex:
+    """
+    In-process индекс глобального бан-листа: отсортированный array('q') с бинарным поиском.
+
+    Загружается из Valkey при первом обращении и перечитывается, когда update_banlist
+    увеличивает версию и рассылает инвалидацию. До загрузки проверки идут в Valkey.
+    """
+
+    def __init__(self) -> None:
+        self._ids = array("q")
+        self._version: int | None = None
+        self._active = False
+        self._refresh_task: asyncio.Task | None = None
+        self._dirty = False
+        invalidation_bus.register("gban", self._on_invalidated, reset=self.schedule_refresh)
+
+    @property
+    def ready(self) -> bool:
+        return self._version is not None
+
+    def _on_invalidated(self, key: str, version: int) -> None:
+        if self._version is None or version > self._version:
+            self.schedule_refresh()
+
+    def schedule_refresh(self) -> None:
+        """Запустить перечитывание индекса в фоне, если индекс уже используется."""
+        if not self._active:
+            return
+        # Идущая загрузка могла прочитать версию до этой инвалидации: она перечитает индекс ещё раз
+        self._dirty = True
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            while self._dirty:
+                self._dirty = False
+                version = int(await valkey.get(VERSION_KEY) or 0)
+                if version == self._version:
+                    continue
+
+                ids = array("q")
+                async for member in valkey.sscan_iter(REDIS_KEY, count=10_000):
+                    ids.append(int(member))
+                ids = array("q", sorted(ids))
+
+                # Список заменили во время чтения: перечитываем
+                if int(await valkey.get(VERSION_KEY) or 0) != version:
+                    self._dirty = True
+                    continue
+
+                self._ids = ids
+                self._version = version
+                logger.info(f"Loaded gban index v{version} with {len(ids)} users")
+        except Exception as e:
+            logger.warning(f"Failed to load gban index: {e}")
+
+    def contains(self, user_id: int) -> bool | None:
+        """Проверить пользователя по индексу; None, если индекс ещё не загружен."""
+        self._active = True
+        if self._version is None:
+            self.schedule_refresh()
+            return None
+        i = bisect_left(self._ids, user_id)
+        return i < len(self._ids) and self._ids[i] == user_id
+
+
+gban_index = GbanIndex()
+
+
+async def _iter_json_ids(chunks: AsyncIterator[bytes]) -> AsyncIterator[int]:
+    """Потоково разбирает JSON-массив ID (числа или строки), не загружая ответ целиком."""
+    buffer = b""
+    started = False
+    async for chunk in chunks:
+        buffer += chunk
+        if not started:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            if not buffer.startswith(b"["):
+                raise ValueError("not a JSON array")
+            buffer = buffer[1:]
+            started = True
+
+        *items, buffer = buffer.split(b",")
+        for item in items:
+            yield _parse_id(item)
+
+    tail = buffer.strip()
+    if not started or not tail.endswith(b"]"):
+        raise ValueError("truncated JSON array")
+    tail = tail[:-1].strip()
+    if tail:
+        yield _parse_id(tail)
+
+
+def _parse_id(item: bytes) -> int:
+    try:
+        return int(item.strip().strip(b'"'))
+    except ValueError:
+        raise ValueError(f"unexpected item {item[:32]!r}") from None
+
+
+def _sorted_unique(ids: array) -> array:
+    """Отсортировать ID и убрать повторы."""
+    result = array("q")
+    for user_id in sorted(ids):
+        if not result or result[-1] != user_id:
+            result.append(user_id)
+    return result
+
+
+def _diff_sorted(new: array, old: array) -> tuple[list[str], list[str]]:
+    """Сравнить два отсортированных набора ID: вернуть добавленные и удалённые."""
+    added: list[str] = []
+    removed: list[str] = []
+    i = j = 0
+    while i < len(new) and j < len(old):
+        if new[i] == old[j]:
+            i += 1
+            j += 1
+        elif new[i] < old[j]:
+            added.append(str(new[i]))
+            i += 1
+        else:
+            removed.append(str(old[j]))
+            j += 1
+    added.extend(str(user_id) for user_id in new[i:])
+    removed.extend(str(user_id) for user_id in old[j:])
+    return added, removed
+
 
 class GbanService:
-    REDIS_KEY = "gban:users"
-    TEMP_KEY = "gban:users:temp"
+    REDIS_KEY = REDIS_KEY
 
     @classmethod
     async def is_banned(cls, user_id: int) -> bool:
         """Проверяет, находится ли пользователь в глобальном бан-листе."""
-        return bool(await valkey.sismember(cls.REDIS_KEY, str(user_id)))
+        banned = gban_index.contains(user_id)
+        if banned is not None:
+            return banned
+        return bool(await cached_call("sismember", cls.REDIS_KEY, str(user_id)))
 
     @classmethod
     async def update_banlist(cls) -> None:
-        """Обновляет глобальный бан-лист из внешнего источника."""
+        """
+        Синхронизирует глобальный бан-лист с внешним источником.
+        Список скачивается только при изменении (ETag/Last-Modified), разбирается потоково,
+        а в Valkey применяется только разница с текущим набором.
+        """
         url = settings.GBAN_LIST_URL
         if not url:
             logger.warning("GBAN_LIST_URL is not set. Skipping update.")
             return
 
         try:
-            async with aiohttp.ClientSession() as session, session.get(url) as response:
+            async with valkey.pipeline(transaction=False) as pipe:
+                pipe.hgetall(HTTP_CACHE_KEY)
+                pipe.scard(cls.REDIS_KEY)
+                cached_headers, banned_count = await pipe.execute()
+
+            # Валидаторы годятся, только пока набор в Valkey совпадает с тем, при котором они сохранены:
+            # после вытеснения или частичного восстановления список скачивается заново
+            if cached_headers.get("count") != str(banned_count):
+                cached_headers = {}
+
+            headers = {}
+            if cached_headers.get("etag"):
+                headers["If-None-Match"] = cached_headers["etag"]
+            if cached_headers.get("last_modified"):
+                headers["If-Modified-Since"] = cached_headers["last_modified"]
+
+            async with aiohttp.ClientSession() as session, session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    logger.info("Gban list is not modified.")
+                    return
                 if response.status != 200:
                     logger.error(f"Failed to fetch gban list: {response.status}")
                     return
 
+                ids = array("q")
                 try:
-                    data = await response.json()
-                except Exception:
-                    logger.error("Failed to parse gban list JSON")
-                    return
-
-                ids: list[str] = []
-                if isinstance(data, list):
-                    ids = [str(x) for x in data]
-                else:
-                    logger.error(f"Unknown gban list format: {type(data)}")
+                    async for user_id in _iter_json_ids(response.content.iter_chunked(64 * 1024)):
+                        ids.append(user_id)
+                except ValueError as e:
+                    logger.error(f"Failed to parse gban list JSON: {e}")
                     return
 
                 if not ids:
                     logger.info("Gban list is empty.")
                     return
 
-                await valkey.delete(cls.TEMP_KEY)
+                new_headers = {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                }
+
+            current = array("q")
+            async for member in valkey.sscan_iter(cls.REDIS_KEY, count=10_000):
+                current.append(int(member))
+
+            ids = _sorted_unique(ids)
+            added, removed = _diff_sorted(ids, _sorted_unique(current))
+            for command, members in (("sadd", added), ("srem", removed)):
+                for i in range(0, len(members), DIFF_CHUNK_SIZE):
+                    await getattr(valkey, command)(cls.REDIS_KEY, *members[i : i + DIFF_CHUNK_SIZE])
 
-                chunk_size = 1000
-                for i in range(0, len(ids), chunk_size):
-                    chunk = ids[i : i + chunk_size]
-                    await valkey.sadd(cls.TEMP_KEY, *chunk)
+            await valkey.hset(HTTP_CACHE_KEY, mapping={**new_headers, "count": len(ids)})
 
-                await valkey.rename(cls.TEMP_KEY, cls.REDIS_KEY)
+            if added or removed:
+                version = await valkey.incr(VERSION_KEY)
+                await invalidation_bus.publish("gban", "all", version)
 
-                logger.info(f"Updated gban list with {len(ids)} users.")
+            logger.info(f"Synced gban list: {len(added)} added, {len(removed)} removed.")
 
         except Exception as e:
             logger.exception(f"Error updating gban list: {e}")
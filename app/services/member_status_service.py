@@ -0,0 +1,104 @@
+import logging
+
+from aiogram import Bot
+from aiogram.enums import ChatMemberStatus
+from aiogram.exceptions import TelegramAPIError
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.valkey import valkey
+
+logger = logging.getLogger(__name__)
+
+ADMIN_STATUSES = frozenset({ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.CREATOR})
+
+L1_TTL = 60
+
+# Служебное поле хэша: список администраторов чата загружен целиком
+_LOADED_FIELD = "#"
+
+
+class ChatMemberStatusCache:
+    """
+    Кэш статусов участников чата для проверок прав.
+
+    Для каждого чата хранится список администраторов (из get_chat_administrators)
+    и статус самого бота; остальные участники считаются обычными (member).
+    Данные лежат в Valkey с коротким TTL и в in-process LRU, а актуальность
+    поддерживается апдейтами chat_member/my_chat_member.
+    """
+
+    KEY_PREFIX = "chat_admins:"
+
+    def __init__(self) -> None:
+        self._l1: LRUCache[int, dict[int, str]] = LRUCache(maxsize=settings.MEMBER_STATUS_CACHE_SIZE, ttl=L1_TTL)
+        invalidation_bus.register("chat_admins", self._on_invalidated, reset=self._l1.clear)
+
+    def _on_invalidated(self, key: str, version: int) -> None:
+        self._l1.pop(int(key))
+
+    async def _seed(self, bot: Bot, chat_id: int) -> dict[int, str]:
+        """Загрузить администраторов чата и статус бота из Bot API."""
+        # get_chat_administrators не возвращает ботов, поэтому статус самого бота запрашиваем отдельно
+        admins = await bot.get_chat_administrators(chat_id)
+        bot_member = await bot.get_chat_member(chat_id, bot.id)
+
+        statuses = {member.user.id: member.status for member in admins}
+        statuses[bot.id] = bot_member.status
+
+        cache_key = f"{self.KEY_PREFIX}{chat_id}"
+        async with valkey.pipeline(transaction=True) as pipe:
+            pipe.delete(cache_key)
+            pipe.hset(cache_key, mapping={_LOADED_FIELD: "", **{str(k): v for k, v in statuses.items()}})
+            pipe.expire(cache_key, settings.MEMBER_STATUS_TTL)
+            await pipe.execute()
+        return statuses
+
+    async def _load(self, bot: Bot, chat_id: int) -> dict[int, str] | None:
+        """Получить статусы администраторов чата; None, если чат не поддерживает список администраторов."""
+        if chat_id > 0:
+            # В личных чатах нет списка администраторов
+            return None
+
+        statuses = self._l1.get(chat_id)
+        if statuses is not None:
+            return statuses
+
+        cached = await valkey.hgetall(f"{self.KEY_PREFIX}{chat_id}")
+        if cached.pop(_LOADED_FIELD, None) is not None:
+            statuses = {int(user_id): status for user_id, status in cached.items()}
+        else:
+            try:
+                statuses = await self._seed(bot, chat_id)
+            except TelegramAPIError as e:
+                logger.debug(f"Cannot load administrators of chat {chat_id}: {e}")
+                return None
+
+        self._l1.set(chat_id, statuses)
+        return statuses
+
+    async def get_status(self, bot: Bot, chat_id: int, user_id: int) -> str:
+        """Получить статус участника чата."""
+        statuses = await self._load(bot, chat_id)
+        if statuses is None:
+            member = await bot.get_chat_member(chat_id, user_id)
+            return member.status
+        return statuses.get(user_id, ChatMemberStatus.MEMBER)
+
+    async def is_admin(self, bot: Bot, chat_id: int, user_id: int) -> bool:
+        """Проверить, является ли участник администратором или создателем чата."""
+        return await self.get_status(bot, chat_id, user_id) in ADMIN_STATUSES
+
+    async def track(self, bot: Bot, chat_id: int, user_id: int, status: str) -> None:
+        """Обновить статус участника по апдейту chat_member/my_chat_member."""
+        cache_key = f"{self.KEY_PREFIX}{chat_id}"
+        if await valkey.exists(cache_key):
+            if status in ADMIN_STATUSES or user_id == bot.id:
+                await valkey.hset(cache_key, str(user_id), status)
+            else:
+                await valkey.hdel(cache_key, str(user_id))
+        await invalidation_bus.publish("chat_admins", chat_id)
+
+
+member_status = ChatMemberStatusCache()
@@ -0,0 +1,308 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import re
+import re._constants as sre_constants
+import re._parser as sre_parser
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.valkey import valkey
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+logger = logging.getLogger(__name__)
+
+SLOW_REGEX_KEY = "triggers:regex:slow"
+
+_REPEAT_OPS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+
+def _find_dangerous_construct(parsed: Any, in_unbounded_repeat: bool = False) -> str | None:
+    """
+    Ищет в разобранном шаблоне конструкции, ведущие к катастрофическому бэктрекингу.
+    Возвращает описание проблемы или None.
+    """
+    for op, av in parsed:
+        if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            return "обратные ссылки запрещены"
+
+        if op in _REPEAT_OPS:
+            min_count, max_count, sub = av
+            if in_unbounded_repeat and min_count != max_count:
+                return "вложенные квантификаторы запрещены"
+            reason = _find_dangerous_construct(sub, in_unbounded_repeat or max_count == sre_constants.MAXREPEAT)
+        elif op == sre_constants.POSSESSIVE_REPEAT:
+            # Притяжательный квантификатор не возвращается в уже пройденные итерации
+            reason = _find_dangerous_construct(av[2])
+        elif op == sre_constants.SUBPATTERN:
+            reason = _find_dangerous_construct(av[-1], in_unbounded_repeat)
+        elif op == sre_constants.BRANCH:
+            reason = next(
+                (r for branch in av[1] if (r := _find_dangerous_construct(branch, in_unbounded_repeat))),
+                None,
+            )
+        elif op == sre_constants.ATOMIC_GROUP:
+            reason = _find_dangerous_construct(av)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            reason = _find_dangerous_construct(av[1], in_unbounded_repeat)
+        else:
+            reason = None
+
+        if reason:
+            return reason
+    return None
+
+
+def _contains_branch(parsed: Any) -> bool:
+    for op, av in parsed:
+        if op == sre_constants.BRANCH:
+            return True
+        if op in _REPEAT_OPS or op == sre_constants.POSSESSIVE_REPEAT:
+            children = [av[2]]
+        elif op == sre_constants.SUBPATTERN:
+            children = [av[-1]]
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            children = [av[1]]
+        else:
+            children = []
+        if any(_contains_branch(child) for child in children):
+            return True
+    return False
+
+
+def _has_ambiguous_repeat(parsed: Any) -> bool:
+    """
+    Ищет неограниченные повторы, тело которых можно сопоставить строке несколькими способами:
+    альтернативы вроде (a|aa)+ или тело переменной длины. Такие шаблоны проходят проверку,
+    но на неподходящем тексте могут работать экспоненциально долго.
+    """
+    for op, av in parsed:
+        if op in _REPEAT_OPS:
+            _, max_count, sub = av
+            if max_count == sre_constants.MAXREPEAT:
+                min_width, max_width = sub.getwidth()
+                if min_width != max_width or _contains_branch(sub):
+                    return True
+            if _has_ambiguous_repeat(sub):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _has_ambiguous_repeat(av[-1]):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(_has_ambiguous_repeat(branch) for branch in av[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _has_ambiguous_repeat(av[1]):
+                return True
+    return False
+
+
+def analyze_regex(pattern: str) -> str | None:
+    """Проверить шаблон на вложенные квантификаторы и обратные ссылки."""
+    return _find_dangerous_construct(sre_parser.parse(pattern))
+
+
+def _compile_re2(pattern: str, is_case_sensitive: bool) -> Any | None:
+    """Скомпилировать шаблон линейным движком RE2, если он установлен и поддерживает шаблон."""
+    if re2 is None:
+        return None
+    try:
+        return re2.compile(pattern if is_case_sensitive else f"(?i){pattern}")
+    except Exception:
+        return None
+
+
+def validate_regex(pattern: str, is_case_sensitive: bool = False) -> None:
+    """
+    Валидирует регулярное выражение триггера.
+    Вызывает ValueError, если шаблон некорректен или подвержен ReDoS.
+    """
+    if _compile_re2(pattern, is_case_sensitive) is not None:
+        return
+
+    try:
+        re.compile(pattern, 0 if is_case_sensitive else re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Некорректное регулярное выражение: {e}") from None
+
+    reason = analyze_regex(pattern)
+    if reason:
+        raise ValueError(f"Небезопасное регулярное выражение: {reason}")
+
+
+def compile_regex(pattern: str, is_case_sensitive: bool) -> tuple[Any, bool]:
+    """
+    Компилирует регулярное выражение триггера.
+    Возвращает скомпилированный шаблон и признак того, что его безопасно выполнять в event loop.
+    Вызывает re.error для некорректного шаблона.
+    """
+    compiled = _compile_re2(pattern, is_case_sensitive)
+    if compiled is not None:
+        return compiled, True
+
+    compiled = re.compile(pattern, 0 if is_case_sensitive else re.IGNORECASE)
+    parsed = sre_parser.parse(pattern)
+    # Шаблоны с неоднозначными повторами допустимы, но выполняются только в песочнице
+    return compiled, _find_dangerous_construct(parsed) is None and not _has_ambiguous_repeat(parsed)
+
+
+class _RegexTimeoutError(Exception):
+    pass
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise _RegexTimeoutError
+
+
+def _search_in_sandbox(
+    items: list[tuple[int, str, int]],
+    text: str,
+    timeout: float,
+) -> tuple[list[int], list[int]]:
+    """
+    Выполняется в отдельном процессе: проверяет шаблоны с ограничением времени на каждый.
+    Движок re проверяет сигналы во время поиска, поэтому SIGALRM прерывает даже зависший шаблон.
+    """
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    matched: list[int] = []
+    timed_out: list[int] = []
+    for idx, pattern, flags in items:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            if re.search(pattern, text, flags):
+                matched.append(idx)
+        except _RegexTimeoutError:
+            timed_out.append(idx)
+        except re.error:
+            pass
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return matched, timed_out
+
+
+class RegexSandbox:
+    """
+    Процессы для проверки потенциально опасных регулярных выражений вне event loop.
+
+    Каждый процесс выполняет одну проверку за раз, поэтому зависший или упавший процесс
+    перезапускается один и не затрагивает проверки в соседних процессах.
+    """
+
+    def __init__(self) -> None:
+        self._idle: asyncio.Queue[ProcessPoolExecutor | None] | None = None
+        self._workers: set[ProcessPoolExecutor] = set()
+
+    def _get_idle(self) -> asyncio.Queue[ProcessPoolExecutor | None]:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            # Процессы запускаются при первой проверке, пустой слот означает ещё не запущенный процесс
+            for _ in range(settings.REGEX_SANDBOX_WORKERS):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    def _spawn(self) -> ProcessPoolExecutor:
+        worker = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker: ProcessPoolExecutor) -> None:
+        for process in list(worker._processes.values()):
+            process.kill()
+        worker.shutdown(wait=False, cancel_futures=True)
+        self._workers.discard(worker)
+
+    async def search(self, items: list[tuple[int, str, int]], text: str) -> tuple[list[int], list[int]]:
+        """
+        Проверить шаблоны в свободном процессе.
+
+        Args:
+            items: Список (индекс, шаблон, флаги)
+            text: Текст сообщения
+
+        Returns:
+            Индексы совпавших шаблонов и индексы шаблонов, не уложившихся в лимит времени
+        """
+        timeout = settings.REGEX_SANDBOX_TIMEOUT_MS / 1000
+        loop = asyncio.get_running_loop()
+        idle = self._get_idle()
+        worker = await idle.get()
+        try:
+            if worker is None:
+                worker = self._spawn()
+            try:
+                future = loop.run_in_executor(worker, _search_in_sandbox, items, text, timeout)
+            except BrokenProcessPool:
+                # Процесс завершился, пока был свободен: проверка ещё не начиналась
+                self._kill(worker)
+                worker = self._spawn()
+                future = loop.run_in_executor(worker, _search_in_sandbox, items, text, timeout)
+            # Внешний таймаут на случай, если процесс завис целиком; ожидание свободного процесса в него не входит
+            return await asyncio.wait_for(future, timeout * len(items) + 5)
+        except (TimeoutError, BrokenProcessPool) as e:
+            logger.error(f"Regex sandbox worker failed: {e!r}, restarting it")
+            self._kill(worker)
+            worker = None
+            return [], [idx for idx, _, _ in items]
+        except asyncio.CancelledError:
+            # Процесс продолжает проверку, и следующая проверка ждала бы её окончания
+            if worker is not None:
+                self._kill(worker)
+                worker = None
+            raise
+        finally:
+            idle.put_nowait(worker)
+
+    def shutdown(self, kill: bool = False) -> None:
+        """Остановить процессы; при kill=True зависшие процессы завершаются принудительно."""
+        for worker in list(self._workers):
+            if kill:
+                self._kill(worker)
+            else:
+                worker.shutdown(wait=False, cancel_futures=True)
+        self._workers.clear()
+        self._idle = None
+
+
+regex_sandbox = RegexSandbox()
+
+_recent_reports: LRUCache[int, bool] = LRUCache(maxsize=1024, ttl=60)
+
+
+async def report_slow_regex(trigger_id: int, pattern: str, elapsed_ms: float, reason: str) -> None:
+    """Сохранить информацию о медленном регулярном выражении для админ-панели."""
+    if _recent_reports.get(trigger_id):
+        return
+    _recent_reports.set(trigger_id, True)
+
+    logger.warning(f"Slow regex in trigger {trigger_id} ({reason}, {elapsed_ms:.1f} ms): {pattern!r}")
+    report = {
+        "elapsed_ms": round(elapsed_ms, 1),
+        "reason": reason,
+        "reported_at": int(time.time()),
+    }
+    try:
+        await valkey.hset(SLOW_REGEX_KEY, str(trigger_id), json.dumps(report))
+    except Exception as e:
+        logger.warning(f"Failed to report slow regex for trigger {trigger_id}: {e}")
+
+
+async def get_slow_regex_reports() -> dict[int, dict]:
+    """Получить отчёты о медленных регулярных выражениях."""
+    raw = await valkey.hgetall(SLOW_REGEX_KEY)
+    return {int(trigger_id): json.loads(report) for trigger_id, report in raw.items()}
+
+
+async def clear_slow_regex_reports(*trigger_ids: int) -> None:
+    """Удалить отчёты о медленных регулярных выражениях."""
+    if trigger_ids:
+        await valkey.hdel(SLOW_REGEX_KEY, *(str(trigger_id) for trigger_id in trigger_ids))
@@ -0,0 +1,182 @@
+import logging
+import socket
+import uuid
+import zlib
+from collections import defaultdict
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import Integer, column, delete, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.valkey import valkey
+from app.db.models.daily_stat import DailyStat
+from app.db.models.stats_flush_batch import StatsFlushBatch
+from app.db.models.trigger import Trigger
+
+logger = logging.getLogger(__name__)
+
+
+class StatsService:
+    """
+    Буферизованные счётчики статистики.
+    Инкременты копятся в хэшах Valkey и периодически выгружаются в Postgres пачкой.
+    """
+
+    TRIGGER_USAGE_KEY = "stats:triggers:usage"
+    TRIGGER_DAILY_KEY = "stats:triggers:daily"
+    MESSAGE_DAILY_KEY = "stats:messages:daily"
+    FLUSH_LOCK_KEY = "stats:flush:lock"
+    FLUSH_LOCK_TTL = 120
+    FLUSH_BATCH_KEY = "stats:flush:batch"
+    # Сколько хранить отметки о выгруженных пачках
+    FLUSH_BATCH_RETENTION = timedelta(days=7)
+
+    # Снять блокировку, только если она всё ещё наша: выгрузка могла пережить TTL блокировки
+    _RELEASE_LOCK_SCRIPT = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+        return redis.call("DEL", KEYS[1])
+    end
+    return 0
+    """
+
+    @classmethod
+    async def record_trigger_usage(cls, trigger_id: int) -> None:
+        """Учесть срабатывание триггера."""
+        async with valkey.pipeline(transaction=True) as pipe:
+            pipe.hincrby(cls.TRIGGER_USAGE_KEY, str(trigger_id), 1)
+            pipe.hincrby(cls.TRIGGER_DAILY_KEY, date.today().isoformat(), 1)
+            await pipe.execute()
+
+    @classmethod
+    def _message_keys(cls) -> list[str]:
+        """Ключи всех шардов счётчика сообщений."""
+        return [f"{cls.MESSAGE_DAILY_KEY}:{shard}" for shard in range(settings.STATS_COUNTER_SHARDS)]
+
+    @classmethod
+    def _daily_sources(cls) -> list[tuple[str, str]]:
+        """Хэши дневных счётчиков и соответствующие им колонки DailyStat."""
+        return [(cls.TRIGGER_DAILY_KEY, "triggers_count"), *((key, "messages_count") for key in cls._message_keys())]
+
+    @classmethod
+    def _message_key(cls) -> str:
+        """Шард счётчика сообщений для текущей реплики."""
+        shard = zlib.crc32(socket.gethostname().encode()) % settings.STATS_COUNTER_SHARDS
+        return f"{cls.MESSAGE_DAILY_KEY}:{shard}"
+
+    @classmethod
+    async def record_message(cls) -> None:
+        """Учесть входящее сообщение."""
+        await valkey.hincrby(cls._message_key(), date.today().isoformat(), 1)
+
+    @classmethod
+    async def get_pending_daily(cls) -> dict[date, dict[str, int]]:
+        """Получить ещё не выгруженные в БД дневные счётчики."""
+        sources = cls._daily_sources()
+        async with valkey.pipeline(transaction=False) as pipe:
+            for key, _ in sources:
+                pipe.hgetall(key)
+                pipe.hgetall(f"{key}:flushing")
+            results = await pipe.execute()
+
+        pending: dict[date, dict[str, int]] = defaultdict(lambda: {"messages_count": 0, "triggers_count": 0})
+        for i, (_, field) in enumerate(sources):
+            for batch in results[2 * i : 2 * i + 2]:
+                for day, count in batch.items():
+                    pending[date.fromisoformat(day)][field] += int(count)
+        return dict(pending)
+
+    @staticmethod
+    async def _take_batch(key: str) -> tuple[str, dict[str, str]]:
+        """
+        Переносит накопленные счётчики в ключ выгрузки и возвращает их.
+        Если прошлая выгрузка не завершилась, её данные возвращаются повторно, а новые ждут следующего раза.
+        """
+        flushing_key = f"{key}:flushing"
+        if not await valkey.exists(flushing_key) and await valkey.exists(key):
+            await valkey.rename(key, flushing_key)
+        return flushing_key, await valkey.hgetall(flushing_key)
+
+    @classmethod
+    async def _get_batch_id(cls) -> str:
+        """
+        Идентификатор текущей пачки выгрузки.
+        Сохраняется до переноса счётчиков и удаляется вместе с ними, поэтому незавершённая выгрузка
+        повторяется с тем же идентификатором.
+        """
+        batch_id = uuid.uuid4().hex
+        if not await valkey.set(cls.FLUSH_BATCH_KEY, batch_id, nx=True):
+            batch_id = await valkey.get(cls.FLUSH_BATCH_KEY)
+        return batch_id
+
+    @classmethod
+    async def flush(cls, session: AsyncSession) -> None:
+        """
+        Выгрузить накопленные счётчики в БД.
+        Идентификатор пачки записывается в той же транзакции, что и счётчики: если процесс упал
+        после коммита, но до очистки Valkey, пачка не учитывается повторно.
+        """
+        lock_token = uuid.uuid4().hex
+        if not await valkey.set(cls.FLUSH_LOCK_KEY, lock_token, nx=True, ex=cls.FLUSH_LOCK_TTL):
+            logger.debug("Stats flush is already running elsewhere")
+            return
+
+        try:
+            batch_id = await cls._get_batch_id()
+            if await session.get(StatsFlushBatch, batch_id):
+                # Прошлая выгрузка зафиксирована в БД, но не успела очистить Valkey
+                logger.warning(f"Stats batch {batch_id} is already flushed, dropping its copy in Valkey")
+                source_keys = [cls.TRIGGER_USAGE_KEY, *(key for key, _ in cls._daily_sources())]
+                await valkey.delete(*(f"{key}:flushing" for key in source_keys), cls.FLUSH_BATCH_KEY)
+                batch_id = await cls._get_batch_id()
+
+            usage_key, usage = await cls._take_batch(cls.TRIGGER_USAGE_KEY)
+            flushing_keys = [usage_key]
+
+            daily: dict[str, dict[str, int]] = defaultdict(lambda: {"messages_count": 0, "triggers_count": 0})
+            for key, field in cls._daily_sources():
+                flushing_key, batch = await cls._take_batch(key)
+                flushing_keys.append(flushing_key)
+                for day, count in batch.items():
+                    daily[day][field] += int(count)
+
+            if not usage and not daily:
+                return
+
+            session.add(StatsFlushBatch(batch_id=batch_id))
+            if usage:
+                deltas = values(
+                    column("id", Integer),
+                    column("delta", Integer),
+                    name="usage_deltas",
+                ).data([(int(trigger_id), int(delta)) for trigger_id, delta in usage.items()])
+                await session.execute(
+                    update(Trigger)
+                    .where(Trigger.id == deltas.c.id)
+                    .values(usage_count=Trigger.usage_count + deltas.c.delta)
+                )
+
+            if daily:
+                stmt = insert(DailyStat).values(
+                    [{"date": date.fromisoformat(day), **counts} for day, counts in daily.items()]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[DailyStat.date],
+                    set_={
+                        DailyStat.messages_count: DailyStat.messages_count + stmt.excluded.messages_count,
+                        DailyStat.triggers_count: DailyStat.triggers_count + stmt.excluded.triggers_count,
+                    },
+                )
+                await session.execute(stmt)
+
+            await session.execute(
+                delete(StatsFlushBatch).where(
+                    StatsFlushBatch.flushed_at < datetime.now(UTC) - cls.FLUSH_BATCH_RETENTION
+                )
+            )
+            await session.commit()
+            await valkey.delete(*flushing_keys, cls.FLUSH_BATCH_KEY)
+            logger.info(f"Flushed stats batch {batch_id}: usage of {len(usage)} triggers, {len(daily)} days")
+        finally:
+            await valkey.eval(cls._RELEASE_LOCK_SCRIPT, 1, cls.FLUSH_LOCK_KEY, lock_token)
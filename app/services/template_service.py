@@ -1,12 +1,15 @@
+import hashlib
 import html
 from datetime import datetime
 from typing import Any
 from zoneinfo import ZoneInfo
 
 from aiogram.types import Chat, User
-from jinja2 import nodes
+from jinja2 import Template, TemplateError, TemplateSyntaxError, nodes
 from jinja2.sandbox import SandboxedEnvironment
 
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.core.time_util import get_timezone
 
 
@@ -60,24 +63,50 @@ def _check_no_loops(node: nodes.Node) -> None:
         _check_no_loops(child)
 
 
+_template_cache: LRUCache[bytes, Template] = LRUCache(maxsize=settings.TEMPLATE_CACHE_SIZE)
+
+
+def compile_template(template_str: str) -> Template:
+    """
+    Возвращает скомпилированный шаблон из кэша или компилирует его.
+    Шаблон разбирается один раз: то же AST проверяется на циклы и компилируется.
+    Вызывает ValueError для некорректного шаблона или при наличии циклов.
+    """
+    key = hashlib.blake2b(template_str.encode(), digest_size=16).digest()
+    template = _template_cache.get(key)
+    if template is not None:
+        return template
+
+    try:
+        ast = env.parse(template_str)
+    except TemplateSyntaxError as e:
+        raise ValueError(f"Синтаксическая ошибка: {e.message}") from None
+    _check_no_loops(ast)
+
+    try:
+        template = env.from_string(ast)
+    except TemplateError as e:
+        # Например, неизвестный фильтр обнаруживается только при компиляции
+        raise ValueError(f"Ошибка шаблона: {e.message}") from None
+    _template_cache.set(key, template)
+    return template
+
+
 def validate_template(template_str: str) -> None:
     """
     Валидирует шаблон на отсутствие циклов.
     Вызывает ValueError если найдены циклы.
     """
-    ast = env.parse(template_str)
-    _check_no_loops(ast)
+    compile_template(template_str)
 
 
 def render_template(template_str: str, context: dict[str, Any]) -> str:
     """
     Рендерит шаблон с предоставленным контекстом.
-    Сначала валидирует шаблон на отсутствие циклов.
+    Непроверенный ранее шаблон валидируется при первой компиляции.
     Возвращает отрендеренную строку.
     """
-    validate_template(template_str)
-    template = env.from_string(template_str)
-    return template.render(**context)
+    return compile_template(template_str).render(**context)
 
 
 def get_render_context(
@@ -0,0 +1,260 @@
+import logging
+import re
+import time
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from app.core.config import settings
+from app.db.models.trigger import MatchType
+from app.schemas.trigger import TriggerSnapshot
+from app.services.regex_guard import compile_regex, regex_sandbox, report_slow_regex
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик для поиска множества подстрок за один проход по тексту.
+    Стоимость поиска зависит от длины текста, а не от количества ключей.
+    """
+
+    __slots__ = ("_fail", "_goto", "_out")
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset[str]] = [frozenset()]
+
+        outputs: list[set[str]] = [set()]
+        for key in keys:
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(key)
+
+        # Строим суффиксные ссылки обходом в ширину
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._out = [frozenset(out) for out in outputs]
+
+    def search(self, text: str) -> set[str]:
+        """Найти все ключи, входящие в текст."""
+        found: set[str] = set(self._out[0])
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1 or bool(self._out[0])
+
+
+def _build_regex_prefilter(patterns: list[re.Pattern]) -> re.Pattern | None:
+    """
+    Собирает общее чередование из регулярок без групп.
+    Если оно не совпало с текстом, ни одна из входящих в него регулярок не совпадёт.
+    """
+    if len(patterns) < 2:
+        return None
+    flags = patterns[0].flags
+    try:
+        return re.compile("|".join(f"(?:{p.pattern})" for p in patterns), flags)
+    except re.error:
+        return None
+
+
+class TriggerMatcher:
+    """
+    Скомпилированный индекс триггеров чата.
+
+    EXACT-ключи лежат в словарях (с учётом регистра и в нижнем регистре),
+    CONTAINS-ключи — в автоматах Ахо-Корасик, REGEXP — в предкомпилированных шаблонах.
+    Порядок результата совпадает с порядком старого линейного поиска:
+    сначала регулярные выражения, затем точные совпадения, затем вхождения.
+
+    Регулярки, не прошедшие анализ сложности или превысившие бюджет времени,
+    проверяются в пуле процессов и не блокируют event loop.
+    """
+
+    def __init__(self, triggers: Sequence[TriggerSnapshot]) -> None:
+        self.triggers = tuple(triggers)
+
+        self._exact: dict[str, list[int]] = {}
+        self._exact_folded: dict[str, list[int]] = {}
+        self._contains: dict[str, list[int]] = {}
+        self._contains_folded: dict[str, list[int]] = {}
+        self._regexps: list[tuple[int, Any]] = []
+        self._guarded: dict[int, tuple[str, int]] = {}
+        self._slow: list[tuple[int, float, str]] = []
+
+        for idx, trigger in enumerate(self.triggers):
+            if trigger.match_type == MatchType.REGEXP:
+                try:
+                    pattern, is_safe = compile_regex(trigger.key_phrase, trigger.is_case_sensitive)
+                except re.error:
+                    logger.debug(f"Invalid regexp in trigger {trigger.id}: {trigger.key_phrase!r}")
+                    continue
+                if is_safe:
+                    self._regexps.append((idx, pattern))
+                else:
+                    self._guard(idx)
+            elif trigger.match_type == MatchType.EXACT:
+                if trigger.is_case_sensitive:
+                    self._exact.setdefault(trigger.key_phrase, []).append(idx)
+                else:
+                    self._exact_folded.setdefault(trigger.key_phrase.lower(), []).append(idx)
+            elif trigger.match_type == MatchType.CONTAINS:
+                if trigger.is_case_sensitive:
+                    self._contains.setdefault(trigger.key_phrase, []).append(idx)
+                else:
+                    self._contains_folded.setdefault(trigger.key_phrase.lower(), []).append(idx)
+
+        self._automaton = AhoCorasick(self._contains)
+        self._automaton_folded = AhoCorasick(self._contains_folded)
+
+        self._prefilters: list[tuple[re.Pattern | None, list[tuple[int, Any]]]] = []
+        self._build_regex_groups()
+
+    def _guard(self, idx: int) -> None:
+        """Перевести регулярку на проверку вне event loop."""
+        trigger = self.triggers[idx]
+        flags = 0 if trigger.is_case_sensitive else re.IGNORECASE
+        self._guarded[idx] = (trigger.key_phrase, flags)
+
+    def _build_regex_groups(self) -> None:
+        """Разбивает регулярки на группы с общим префильтром."""
+        groupless: dict[int, list[tuple[int, re.Pattern]]] = {}
+        standalone: list[tuple[int, Any]] = []
+        for idx, pattern in self._regexps:
+            if isinstance(pattern, re.Pattern) and pattern.groups == 0:
+                groupless.setdefault(pattern.flags, []).append((idx, pattern))
+            else:
+                standalone.append((idx, pattern))
+
+        for items in groupless.values():
+            prefilter = _build_regex_prefilter([pattern for _, pattern in items])
+            if prefilter is None:
+                standalone.extend(items)
+            else:
+                self._prefilters.append((prefilter, items))
+
+        if standalone:
+            self._prefilters.append((None, standalone))
+
+    def _demote_slow(self) -> None:
+        """Убрать медленные регулярки из event loop и пересобрать префильтры."""
+        slow = {idx for idx, _, _ in self._slow}
+        for idx in slow:
+            self._guard(idx)
+        self._regexps = [(idx, pattern) for idx, pattern in self._regexps if idx not in slow]
+        self._prefilters = []
+        self._build_regex_groups()
+
+    def _match_regexps(self, text: str) -> tuple[list[int], list[int]]:
+        """
+        Проверяет регулярки в event loop в пределах бюджета времени на сообщение.
+        Возвращает совпавшие индексы и индексы, которые нужно проверить вне event loop.
+        """
+        budget = settings.REGEX_MATCH_BUDGET_MS / 1000
+        started = time.perf_counter()
+        matched: list[int] = []
+        deferred: list[int] = []
+        slow_before = len(self._slow)
+
+        for prefilter, items in self._prefilters:
+            if time.perf_counter() - started > budget:
+                deferred.extend(idx for idx, _ in items)
+                continue
+            if prefilter is not None and not prefilter.search(text):
+                continue
+            for idx, pattern in items:
+                pattern_started = time.perf_counter()
+                if pattern_started - started > budget:
+                    deferred.append(idx)
+                    continue
+                if pattern.search(text):
+                    matched.append(idx)
+                elapsed = time.perf_counter() - pattern_started
+                if elapsed > budget:
+                    self._slow.append((idx, elapsed * 1000, "budget"))
+
+        if len(self._slow) > slow_before:
+            self._demote_slow()
+        return matched, deferred
+
+    async def match(self, text: str) -> list[TriggerSnapshot]:
+        """Найти все подходящие триггеры для текста."""
+        regex_matches: list[int] = []
+        if self._regexps or self._guarded:
+            regex_matches, deferred = self._match_regexps(text) if self._regexps else ([], [])
+            deferred.extend(self._guarded)
+            if deferred:
+                regex_matches.extend(await self._match_off_loop(deferred, text))
+            if self._slow:
+                await self._report_slow()
+            regex_matches.sort()
+
+        exact_matches: list[int] = []
+        contains_matches: list[int] = []
+
+        if self._exact:
+            exact_matches.extend(self._exact.get(text, ()))
+
+        folded = text.lower() if self._exact_folded or self._automaton_folded else text
+        if self._exact_folded:
+            exact_matches.extend(self._exact_folded.get(folded, ()))
+
+        if self._automaton:
+            for key in self._automaton.search(text):
+                contains_matches.extend(self._contains[key])
+        if self._automaton_folded:
+            for key in self._automaton_folded.search(folded):
+                contains_matches.extend(self._contains_folded[key])
+
+        indices = [*regex_matches, *sorted(exact_matches), *sorted(contains_matches)]
+        return [self.triggers[idx] for idx in indices]
+
+    async def _match_off_loop(self, indices: list[int], text: str) -> list[int]:
+        """Проверить регулярки в пуле процессов с ограничением времени на каждую."""
+        items = []
+        for idx in dict.fromkeys(indices):
+            if idx not in self._guarded:
+                self._guard(idx)
+            pattern, flags = self._guarded[idx]
+            items.append((idx, pattern, flags))
+
+        matched, timed_out = await regex_sandbox.search(items, text)
+        timeout_ms = settings.REGEX_SANDBOX_TIMEOUT_MS
+        self._slow.extend((idx, timeout_ms, "timeout") for idx in timed_out)
+        return matched
+
+    async def _report_slow(self) -> None:
+        slow, self._slow = self._slow, []
+        for idx, elapsed_ms, reason in slow:
+            trigger = self.triggers[idx]
+            await report_slow_regex(trigger.id, trigger.key_phrase, elapsed_ms, reason)
+
+    def __len__(self) -> int:
+        return len(self.triggers)
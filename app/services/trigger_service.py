@@ -1,19 +1,30 @@
 import json
-import re
-from datetime import date
-
-from sqlalchemy import delete, func, select, update
-from sqlalchemy.dialects.postgresql import insert
+import logging
+from collections.abc import Mapping
+from dataclasses import replace
+from typing import Any, NamedTuple
+
+from aiogram.methods import SendDice, TelegramMethod
+from aiogram.types import Message
+from redis.exceptions import WatchError
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.broker import broker
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
 from app.core.storage import storage
 from app.core.valkey import valkey
-from app.db.models.daily_stat import DailyStat
 from app.db.models.moderation_history import ModerationStep
 from app.db.models.trigger import AccessLevel, MatchType, ModerationStatus, Trigger
 from app.schemas.moderation import TriggerModerationTask
+from app.schemas.trigger import TriggerSnapshot
 from app.services.moderation_history_service import add_history_step
+from app.services.regex_guard import clear_slow_regex_reports, get_slow_regex_reports, validate_regex
+from app.services.trigger_matcher import TriggerMatcher
+
+logger = logging.getLogger(__name__)
 
 CACHE_TTL = 3600
 
@@ -62,6 +73,9 @@ async def create_trigger(
     is_template: bool = False,
 ) -> Trigger:
     """Создать новый триггер."""
+    if match_type == MatchType.REGEXP:
+        validate_regex(key_phrase, is_case_sensitive)
+
     moderation_status = ModerationStatus.SAFE if skip_moderation else ModerationStatus.PENDING
 
     trigger = Trigger(
@@ -82,7 +96,7 @@ async def create_trigger(
     await add_history_step(session, trigger.id, ModerationStep.CREATED)
 
     await session.commit()
-    await valkey.delete(f"triggers:{chat_id}")
+    await invalidate_triggers_cache(chat_id)
 
     if skip_moderation:
         return trigger
@@ -141,7 +155,7 @@ async def approve_trigger(session: AsyncSession, trigger_id: int, admin_id: int)
     )
     await session.commit()
     await session.refresh(trigger)
-    await valkey.delete(f"triggers:{trigger.chat_id}")
+    await invalidate_triggers_cache(trigger.chat_id)
     return trigger
 
 
@@ -216,21 +230,83 @@ async def get_triggers_filtered(
     return list(triggers), total
 
 
-async def get_triggers_by_chat(session: AsyncSession, chat_id: int) -> list[Trigger]:
-    """Получить все триггеры чата (с кэшированием)."""
-    cache_key = f"triggers:{chat_id}"
-    cached_data = await valkey.get(cache_key)
+class _CachedTriggers(NamedTuple):
+    version: int
+    matcher: TriggerMatcher | None
+
+
+_l1_triggers: LRUCache[int, _CachedTriggers] = LRUCache(
+    maxsize=settings.TRIGGER_MATCHER_CACHE_SIZE,
+    ttl=settings.TRIGGER_L1_TTL,
+)
+
+
+def _on_triggers_invalidated(key: str, version: int) -> None:
+    """Оставить в L1 метку версии, чтобы запоздавшая загрузка не вернула устаревший снимок."""
+    chat_id = int(key)
+    cached = _l1_triggers.get(chat_id)
+    if cached and cached.version >= version:
+        return
+    _l1_triggers.set(chat_id, _CachedTriggers(version=version, matcher=None))
+
+
+invalidation_bus.register("triggers", _on_triggers_invalidated, reset=_l1_triggers.clear)
+
+
+async def invalidate_triggers_cache(chat_id: int) -> None:
+    """Сбросить кэш триггеров чата в Valkey и в памяти всех реплик."""
+    async with valkey.pipeline(transaction=True) as pipe:
+        pipe.delete(f"triggers:{chat_id}")
+        pipe.incr(f"triggers:version:{chat_id}")
+        _, version = await pipe.execute()
+    await invalidation_bus.publish("triggers", chat_id, version)
+
+
+def _build_send_method(trigger_id: int, content: Mapping[str, Any]) -> TelegramMethod | None:
+    """
+    Готовит метод отправки копии сохранённого сообщения.
+    chat_id подставляется при отправке, шаблонные поля перерисовываются поверх.
+    """
+    try:
+        saved_msg = Message.model_validate(content)
+        if saved_msg.dice:
+            # send_copy не передаёт emoji кубика
+            return SendDice(chat_id=0, emoji=saved_msg.dice.emoji)
+        return saved_msg.send_copy(chat_id=0)
+    except Exception as e:
+        logger.warning(f"Cannot prepare send method for trigger {trigger_id}: {e}")
+        return None
+
+
+def _build_snapshot(data: dict[str, Any]) -> TriggerSnapshot:
+    """Собрать снимок триггера с заранее подготовленным методом отправки."""
+    snapshot = TriggerSnapshot.from_dict(data)
+    return replace(snapshot, send_method=_build_send_method(snapshot.id, snapshot.content))
 
+
+async def _store_trigger_snapshots(chat_id: int, triggers_list: list[dict], version: int) -> None:
+    """Записать снимки триггеров в Valkey, если с момента чтения версии кэш не сбрасывался."""
+    version_key = f"triggers:version:{chat_id}"
+    async with valkey.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(version_key)
+            if int(await pipe.get(version_key) or 0) != version:
+                return
+            pipe.multi()
+            pipe.set(f"triggers:{chat_id}", json.dumps(triggers_list), ex=CACHE_TTL)
+            await pipe.execute()
+        except WatchError:
+            # Триггеры изменились во время загрузки: прочитанные данные могли устареть
+            pass
+
+
+async def _load_trigger_snapshots(session: AsyncSession, chat_id: int) -> tuple[list[TriggerSnapshot], int]:
+    """Получить снимки триггеров чата и их версию из кэша или из БД."""
+    cache_key = f"triggers:{chat_id}"
+    cached_data, version = await valkey.mget(cache_key, f"triggers:version:{chat_id}")
+    version = int(version or 0)
     if cached_data:
-        triggers_data = json.loads(cached_data)
-        triggers = []
-        for t_data in triggers_data:
-            t_data["match_type"] = MatchType(t_data["match_type"])
-            t_data["access_level"] = AccessLevel(t_data["access_level"])
-            t_data["is_template"] = t_data.get("is_template", False)
-            t = Trigger(**t_data)
-            triggers.append(t)
-        return triggers
+        return [_build_snapshot(t_data) for t_data in json.loads(cached_data)], version
 
     stmt = select(Trigger).where(Trigger.chat_id == chat_id)
     result = await session.execute(stmt)
@@ -252,43 +328,26 @@ async def get_triggers_by_chat(session: AsyncSession, chat_id: int) -> list[Trig
         }
         triggers_list.append(t_dict)
 
-    await valkey.set(cache_key, json.dumps(triggers_list), ex=CACHE_TTL)
+    await _store_trigger_snapshots(chat_id, triggers_list, version)
+    return [_build_snapshot(t_data) for t_data in triggers_list], version
 
-    return list(triggers)
 
+async def get_trigger_matcher(session: AsyncSession, chat_id: int) -> TriggerMatcher:
+    """
+    Получить скомпилированный индекс триггеров чата.
+    Горячие чаты обслуживаются из in-process L1 без обращения к Valkey.
+    """
+    cached = _l1_triggers.get(chat_id)
+    if cached and cached.matcher is not None:
+        return cached.matcher
 
-async def find_matches(triggers: list[Trigger], text: str) -> list[Trigger]:
-    """Найти все подходящие триггеры для текста."""
-    matches = []
-    regex_triggers = [t for t in triggers if t.match_type == MatchType.REGEXP]
-    exact_triggers = [t for t in triggers if t.match_type == MatchType.EXACT]
-    contains_triggers = [t for t in triggers if t.match_type == MatchType.CONTAINS]
+    snapshots, version = await _load_trigger_snapshots(session, chat_id)
+    matcher = TriggerMatcher(snapshots)
 
-    for t in regex_triggers:
-        flags = 0 if t.is_case_sensitive else re.IGNORECASE
-        try:
-            if re.search(t.key_phrase, text, flags):
-                matches.append(t)
-        except re.error:
-            continue
-
-    for t in exact_triggers:
-        if t.is_case_sensitive:
-            if text == t.key_phrase:
-                matches.append(t)
-        else:
-            if text.lower() == t.key_phrase.lower():
-                matches.append(t)
-
-    for t in contains_triggers:
-        if t.is_case_sensitive:
-            if t.key_phrase in text:
-                matches.append(t)
-        else:
-            if t.key_phrase.lower() in text.lower():
-                matches.append(t)
-
-    return matches
+    cached = _l1_triggers.get(chat_id)
+    if not cached or cached.version <= version:
+        _l1_triggers.set(chat_id, _CachedTriggers(version=version, matcher=matcher))
+    return matcher
 
 
 async def get_trigger_by_key(session: AsyncSession, chat_id: int, key_phrase: str) -> Trigger | None:
@@ -311,30 +370,11 @@ async def delete_trigger_by_key(session: AsyncSession, chat_id: int, key_phrase:
 
         await session.delete(trigger)
         await session.commit()
-        await valkey.delete(f"triggers:{chat_id}")
+        await invalidate_triggers_cache(chat_id)
         return True
     return False
 
 
-async def increment_usage(session: AsyncSession, trigger_id: int) -> None:
-    """Увеличить счетчик использования триггера."""
-    stmt = update(Trigger).where(Trigger.id == trigger_id).values(usage_count=Trigger.usage_count + 1)
-    await session.execute(stmt)
-
-    today = date.today()
-    stat_stmt = (
-        insert(DailyStat)
-        .values(date=today, triggers_count=1)
-        .on_conflict_do_update(
-            index_elements=[DailyStat.date],
-            set_={DailyStat.triggers_count: DailyStat.triggers_count + 1},
-        )
-    )
-    await session.execute(stat_stmt)
-
-    await session.commit()
-
-
 async def get_triggers_count(session: AsyncSession, chat_id: int) -> int:
     """Получить количество триггеров в чате."""
     stmt = select(func.count()).select_from(Trigger).where(Trigger.chat_id == chat_id)
@@ -367,6 +407,14 @@ async def update_trigger(session: AsyncSession, trigger_id: int, **kwargs) -> Tr
     if not trigger:
         return None
 
+    if kwargs.keys() & {"key_phrase", "match_type", "is_case_sensitive"}:
+        if kwargs.get("match_type", trigger.match_type) == MatchType.REGEXP:
+            validate_regex(
+                kwargs.get("key_phrase", trigger.key_phrase),
+                kwargs.get("is_case_sensitive", trigger.is_case_sensitive),
+            )
+        await clear_slow_regex_reports(trigger.id)
+
     if "content" in kwargs:
         old_file_id = get_file_id_from_content(trigger.content)
         new_file_id = get_file_id_from_content(kwargs["content"])
@@ -380,7 +428,7 @@ async def update_trigger(session: AsyncSession, trigger_id: int, **kwargs) -> Tr
     await session.commit()
     await session.refresh(trigger)
 
-    await valkey.delete(f"triggers:{trigger.chat_id}")
+    await invalidate_triggers_cache(trigger.chat_id)
 
     return trigger
 
@@ -398,8 +446,9 @@ async def delete_trigger_by_id(session: AsyncSession, trigger_id: int) -> bool:
     chat_id = trigger.chat_id
     await session.delete(trigger)
     await session.commit()
+    await clear_slow_regex_reports(trigger_id)
 
-    await valkey.delete(f"triggers:{chat_id}")
+    await invalidate_triggers_cache(chat_id)
 
     return True
 
@@ -411,6 +460,23 @@ async def delete_all_triggers_by_chat(session: AsyncSession, chat_id: int) -> in
     deleted_count = result.rowcount
     await session.commit()
 
-    await valkey.delete(f"triggers:{chat_id}")
+    await invalidate_triggers_cache(chat_id)
 
     return deleted_count
+
+
+async def get_slow_regex_triggers(session: AsyncSession) -> list[tuple[Trigger, dict]]:
+    """Получить триггеры с медленными регулярными выражениями и отчёты о них."""
+    reports = await get_slow_regex_reports()
+    if not reports:
+        return []
+
+    stmt = select(Trigger).where(Trigger.id.in_(reports))
+    result = await session.execute(stmt)
+    triggers = {t.id: t for t in result.scalars()}
+
+    stale = [trigger_id for trigger_id in reports if trigger_id not in triggers]
+    if stale:
+        await clear_slow_regex_reports(*stale)
+
+    return [(triggers[trigger_id], report) for trigger_id, report in reports.items() if trigger_id in triggers]
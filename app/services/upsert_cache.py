@@ -0,0 +1,51 @@
+from collections.abc import Hashable
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+class UpsertCoalescer:
+    """
+    Память о последних записанных в БД профилях пользователей и чатов.
+
+    Middleware обновляют профиль на каждом апдейте, хотя почти всегда данные не меняются.
+    Здесь хранится отпечаток последней записи, чтобы пропускать повторные upsert,
+    и время последнего обновления связи пользователь-чат, чтобы трогать её не чаще
+    USER_CHAT_TOUCH_INTERVAL. Кэш живёт в пределах процесса: запись с другой реплики
+    может быть не замечена, поэтому отпечатки устаревают через UPSERT_FINGERPRINT_TTL.
+    """
+
+    def __init__(self) -> None:
+        self._fingerprints: LRUCache[tuple[str, int], Hashable] = LRUCache(
+            maxsize=settings.UPSERT_CACHE_SIZE, ttl=settings.UPSERT_FINGERPRINT_TTL
+        )
+        self._touched: LRUCache[tuple[int, int], bool] = LRUCache(
+            maxsize=settings.UPSERT_CACHE_SIZE, ttl=settings.USER_CHAT_TOUCH_INTERVAL
+        )
+
+    def is_unchanged(self, kind: str, entity_id: int, fingerprint: Hashable) -> bool:
+        """Проверить, что профиль уже записан в БД с такими же данными."""
+        return self._fingerprints.get((kind, entity_id)) == fingerprint
+
+    def remember(self, kind: str, entity_id: int, fingerprint: Hashable) -> None:
+        """Запомнить отпечаток профиля после успешной записи."""
+        self._fingerprints.set((kind, entity_id), fingerprint)
+
+    def forget(self, kind: str, entity_id: int) -> None:
+        """Забыть отпечаток, чтобы следующая запись прошла в БД."""
+        self._fingerprints.pop((kind, entity_id))
+
+    def should_touch(self, user_id: int, chat_id: int) -> bool:
+        """Проверить, пора ли обновить связь пользователь-чат."""
+        return not self._touched.get((user_id, chat_id))
+
+    def mark_touched(self, user_id: int, chat_id: int) -> None:
+        """Отметить обновление связи пользователь-чат."""
+        self._touched.set((user_id, chat_id), True)
+
+    def forget_membership(self, user_id: int, chat_id: int) -> None:
+        """Сбросить отметку обновления связи пользователь-чат."""
+        self._touched.pop((user_id, chat_id))
+
+
+upsert_coalescer = UpsertCoalescer()
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 
 from sqlalchemy import String, case, cast, delete, func, or_, select, update
 from sqlalchemy.dialects.postgresql import insert
@@ -6,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.core.config import settings
+from app.core.database import after_commit, commit_or_join
 from app.db.models.captcha_session import ChatCaptchaSession
 from app.db.models.moderation_history import ModerationHistory
 from app.db.models.trigger import Trigger
@@ -13,6 +15,7 @@ from app.db.models.trust_history import ChatTrustHistory
 from app.db.models.user import User
 from app.db.models.user_chat import UserChat
 from app.db.models.warn import Warn
+from app.services.upsert_cache import upsert_coalescer
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +33,44 @@ async def get_or_create_user(
     """
     Получает пользователя из базы данных или создает нового.
     Также обновляет информацию о пользователе.
+    Если профиль не изменился с последней записи, пользователь только читается из БД.
     """
+    profile = {
+        "username": username,
+        "first_name": first_name,
+        "last_name": last_name,
+        "language_code": language_code,
+        "is_premium": is_premium,
+        "is_bot": is_bot,
+    }
+    fingerprint = tuple(profile.values())
+    user = None
+    if upsert_coalescer.is_unchanged("user", user_id, fingerprint):
+        user = await session.get(User, user_id)
+
+    if user is None:
+        after_commit(session, partial(upsert_coalescer.remember, "user", user_id, fingerprint))
+        user = await _upsert_user(session, user_id, **profile)
+
+    if user_id in settings.BOT_ADMINS:
+        user.is_bot_moderator = True
+        user.is_trusted = True
+
+    return user
+
+
+async def _upsert_user(
+    session: AsyncSession,
+    user_id: int,
+    *,
+    username: str | None,
+    first_name: str | None,
+    last_name: str | None,
+    language_code: str | None,
+    is_premium: bool | None,
+    is_bot: bool,
+) -> User:
+    """Создаёт пользователя или обновляет его профиль."""
     stmt = (
         insert(User)
         .values(
@@ -57,13 +97,8 @@ async def get_or_create_user(
         .returning(User)
     )
     result = await session.execute(stmt)
-    await session.commit()
     user = result.scalar_one()
-
-    if user_id in settings.BOT_ADMINS:
-        user.is_bot_moderator = True
-        user.is_trusted = True
-
+    await commit_or_join(session)
     return user
 
 
@@ -216,4 +251,5 @@ async def delete_user(session: AsyncSession, user_id: int) -> None:
     )
 
     await session.commit()
+    upsert_coalescer.forget("user", user_id)
     logger.info("User %d and all related data deleted", user_id)
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.broker import broker, delayed_exchange
 from app.db.models.chat import Chat
+from app.schemas.chat import ChatContext
 from app.services.chat_variable_service import get_vars
 from app.services.template_service import get_render_context, render_template
 
@@ -19,7 +20,7 @@ async def send_welcome_message(
     session: AsyncSession,
     chat: AiogramChat,
     user: User,
-    db_chat: Chat,
+    db_chat: Chat | ChatContext,
 ) -> Message | None:
     """
     Отправляет приветственное сообщение в чат.
@@ -7,8 +7,8 @@ from app.bot.instance import bot
 from app.core.broker import broker
 from app.core.database import engine
 from app.core.i18n import ROOT_LOCALE, translator_hub
-from app.core.valkey import valkey
 from app.db.models.captcha_session import ChatCaptchaSession
+from app.db.models.chat import Chat
 from faststream.rabbit import RabbitExchange
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
@@ -58,8 +58,8 @@ async def kick_unverified_user(chat_id: int, user_id: int, session_id: int) -> N
             await bot.unban_chat_member(chat_id=chat_id, user_id=user_id)
 
             try:
-                lang_code = await valkey.get(f"lang:{chat_id}")
-                i18n = translator_hub.get_translator_by_locale(lang_code or ROOT_LOCALE)
+                chat = await session.get(Chat, chat_id)
+                i18n = translator_hub.get_translator_by_locale(chat.language_code if chat else ROOT_LOCALE)
 
                 await bot.edit_message_text(
                     chat_id=chat_id,
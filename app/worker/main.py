@@ -1,9 +1,10 @@
 import logging
 
 from app.core.broker import broker
+from app.core.config import settings
 from app.core.database import engine
 from app.core.logging import setup_logging
-from app.core.tasks import update_gban_task
+from app.core.tasks import flush_stats_task, update_gban_task
 from app.db.models.moderation_history import ModerationStep
 from app.db.models.trigger import Trigger
 from app.schemas.moderation import TriggerModerationTask
@@ -34,6 +35,7 @@ async def start_scheduler() -> None:
     logger.info("Starting scheduler...")
     scheduler.add_job(update_gban_task)
     scheduler.add_job(update_gban_task, "interval", hours=1)
+    scheduler.add_job(flush_stats_task, "interval", seconds=settings.STATS_FLUSH_INTERVAL)
     scheduler.start()
 
 
@@ -42,6 +44,7 @@ async def stop_scheduler() -> None:
     """Остановка планировщика задач."""
     logger.info("Stopping scheduler...")
     scheduler.shutdown()
+    await flush_stats_task()
 
 
 @broker.subscriber("q.moderation.analyze")
@@ -8,6 +8,7 @@ from app.db.models.moderation_history import ModerationStep
 from app.db.models.trigger import ModerationStatus, Trigger
 from app.schemas.moderation import ModerationAlert, ModerationLLMResult, TriggerModerationTask
 from app.services.moderation_history_service import add_history_step
+from app.services.trigger_service import invalidate_triggers_cache
 from app.worker.image import extract_frame_from_video_path
 from app.worker.llm import call_vision_model
 from app.worker.telegram import download_file, download_file_to_path, get_telegram_file_url
@@ -84,7 +85,7 @@ async def handle_moderation_result(
             details={"error": "AI failed to process"},
         )
         await session.commit()
-        await valkey.delete(f"triggers:{chat_id}")
+        await invalidate_triggers_cache(chat_id)
 
         if await session.get(Trigger, trigger_id):
             alert = ModerationAlert(
@@ -111,7 +112,7 @@ async def handle_moderation_result(
             details={"reasoning": result.reasoning},
         )
         await session.commit()
-        await valkey.delete(f"triggers:{chat_id}")
+        await invalidate_triggers_cache(chat_id)
         logger.info(f"Trigger {trigger_id} marked as Safe. Reasoning: {result.reasoning}")
     else:
         trigger.moderation_status = ModerationStatus.FLAGGED
@@ -127,7 +128,7 @@ async def handle_moderation_result(
             },
         )
         await session.commit()
-        await valkey.delete(f"triggers:{chat_id}")
+        await invalidate_triggers_cache(chat_id)
 
         if await session.get(Trigger, trigger_id):
             alert = ModerationAlert(
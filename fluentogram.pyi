@@ -84,12 +84,17 @@ class TriggerValidation:
     @staticmethod
     def error(*, error: PossibleValue) -> Literal["""Ошибка валидации шаблона: { $error }"""]: ...
 
+class TriggerRegex:
+    @staticmethod
+    def error(*, error: PossibleValue) -> Literal["""Регулярное выражение отклонено: { $error }"""]: ...
+
 class Trigger:
     add: TriggerAdd
     list: TriggerList
     edit: TriggerEdit
     delete: TriggerDelete
     validation: TriggerValidation
+    regex: TriggerRegex
 
     @staticmethod
     def added(*, trigger_key: PossibleValue) -> Literal["""Триггер «{ $trigger_key }» успешно добавлен!"""]: ...
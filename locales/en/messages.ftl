@@ -253,6 +253,7 @@ warns-none = User has no warnings.
 warns-none-user = User { $name } has no warnings.
 punishment-duration-select = Select punishment duration:
 trigger-validation-error = Template validation error: { $error }
+trigger-regex-error = Regular expression rejected: { $error }
 content-type-text = Text
 content-type-photo = Photo
 content-type-video = Video
@@ -253,6 +253,7 @@ warns-none = У пользователя нет предупреждений.
 warns-none-user = У пользователя { $name } нет предупреждений.
 punishment-duration-select = Выберите длительность наказания:
 trigger-validation-error = Ошибка валидации шаблона: { $error }
+trigger-regex-error = Регулярное выражение отклонено: { $error }
 content-type-text = Текст
 content-type-photo = Фото
 content-type-video = Видео